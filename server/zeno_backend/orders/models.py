@@ -3,7 +3,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from django.db.models import Avg, Sum, F 
+from django.db.models import Avg, Count, Sum, F, Q
 
 User = get_user_model()
 
@@ -239,28 +239,25 @@ class Order(models.Model):
         """Update vendor performance metrics for this order"""
         if hasattr(self.vendor, 'performance'):
             performance = self.vendor.performance
-            performance.total_orders = self.vendor.orders.count()
-            performance.completed_orders = self.vendor.orders.filter(status='completed').count()
-            performance.cancelled_orders = self.vendor.orders.filter(status='cancelled').count()
-            
-            # Calculate average order value
-            avg_value = self.vendor.orders.aggregate(avg=Avg('total_amount'))['avg'] or 0
-            performance.average_order_value = avg_value
-            
-            # ✅ FIXED: Use only existing fields - no more 'commission_amount' field reference
-            completed_orders = self.vendor.orders.filter(status='completed')
-            
-            # ✅ FIXED: Use 'total_amount' field that exists
-            performance.total_revenue = completed_orders.aggregate(total=Sum('total_amount'))['total'] or 0
-            
-            # ✅ FIXED: Use 'vendor_earnings' field that exists  
-            performance.total_earnings = completed_orders.aggregate(total=Sum('vendor_earnings'))['total'] or 0
-            
-            # ✅ CRITICAL FIX: Calculate commission using commission_rate instead of commission_amount
-            # Use F expressions to calculate commission on the database level
-            performance.total_commission = completed_orders.aggregate(
-                total=Sum(F('total_amount') * F('commission_rate') / 100)
-            )['total'] or 0
+            completed = Q(status='completed')
+            # Every metric in one pass over the vendor's orders
+            stats = self.vendor.orders.order_by().aggregate(
+                total_orders=Count('id'),
+                completed_orders=Count('id', filter=completed),
+                cancelled_orders=Count('id', filter=Q(status='cancelled')),
+                average_order_value=Avg('total_amount'),
+                total_revenue=Sum('total_amount', filter=completed),
+                total_earnings=Sum('vendor_earnings', filter=completed),
+                # Commission from commission_rate; orders have no commission_amount column
+                total_commission=Sum(F('total_amount') * F('commission_rate') / 100, filter=completed),
+            )
+            performance.total_orders = stats['total_orders']
+            performance.completed_orders = stats['completed_orders']
+            performance.cancelled_orders = stats['cancelled_orders']
+            performance.average_order_value = stats['average_order_value'] or 0
+            performance.total_revenue = stats['total_revenue'] or 0
+            performance.total_earnings = stats['total_earnings'] or 0
+            performance.total_commission = stats['total_commission'] or 0
             
             performance.save()
     # ========== END NEW PROPERTIES ==========
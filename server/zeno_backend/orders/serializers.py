@@ -430,8 +430,7 @@ class CreateGasProductOrderSimpleSerializer(serializers.ModelSerializer):
             # Update stock
             from vendors.models import GasProduct
             gas_product = GasProduct.objects.get(id=item['product'])
-            gas_product.stock_quantity -= item['quantity']
-            gas_product.save()
+            gas_product.adjust_stock(-item['quantity'])
         
         # Create initial tracking
         OrderTracking.objects.create(order=order, status='pending')
@@ -250,8 +250,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         quantity = validated_data['quantity']
         
         # Update product stock
-        gas_product.stock_quantity -= quantity
-        gas_product.save()
+        gas_product.adjust_stock(-quantity)
         
         # Create order with commission data
         order = Order.objects.create(
@@ -314,9 +313,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             
             # Update stock for gas products
             if item_data['type'] == 'gas_product':
-                gas_product = item_data['object']
-                gas_product.stock_quantity -= item_data['quantity']
-                gas_product.save()
+                item_data['object'].adjust_stock(-item_data['quantity'])
         
         # Update order total and vendor earnings
         order.total_amount = total_amount
@@ -405,15 +402,13 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         # Restore stock for gas product orders
         if order.gas_product and order.order_type == 'gas_product':
-            order.gas_product.stock_quantity += order.quantity
-            order.gas_product.save()
+            order.gas_product.adjust_stock(order.quantity)
         
         elif order.order_type == 'mixed':
             # Restore stock for all gas product items
             for item in order.items.filter(item_type='gas_product'):
                 if item.gas_product:
-                    item.gas_product.stock_quantity += item.quantity
-                    item.gas_product.save()
+                    item.gas_product.adjust_stock(item.quantity)
         
         order.status = 'cancelled'
         order.save()
@@ -1,6 +1,7 @@
 # payments/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
+from django.db import transaction
 from django.db.models import Sum, Count, Avg
 from .models import Payment, MpesaConfiguration, PayoutRequest, CommissionSummary, PaymentWebhookLog
 from django.utils import timezone
@@ -155,12 +156,27 @@ class PaymentAdmin(admin.ModelAdmin):
     mark_as_failed.short_description = "Mark selected payments as failed"
 
     def process_commissions(self, request, queryset):
-        processed = 0
-        for payment in queryset:
-            if payment.status == 'completed' and not payment.vendor_earning:
-                payment._create_vendor_earning()
-                processed += 1
-        self.message_user(request, f'Commissions processed for {processed} payments.')
+        from vendors.models import VendorEarning
+        
+        payments = []
+        earnings = []
+        for payment in queryset.filter(status='completed', vendor_earning__isnull=True).select_related('order'):
+            earning = payment._build_vendor_earning()
+            if earning is not None:
+                payments.append(payment)
+                earnings.append(earning)
+        
+        # One INSERT for the earnings and one UPDATE for the payments, instead
+        # of a create and a save per payment
+        with transaction.atomic():
+            VendorEarning.objects.bulk_record(earnings)
+            now = timezone.now()
+            for payment, earning in zip(payments, earnings):
+                payment.vendor_earning = earning
+                payment.payout_status = 'processed'
+                payment.updated_at = now
+            Payment.objects.bulk_update(payments, ['vendor_earning', 'payout_status', 'updated_at'])
+        self.message_user(request, f'Commissions processed for {len(payments)} payments.')
     process_commissions.short_description = "Process commissions for selected payments"
 
     def update_payout_status(self, request, queryset):
@@ -99,23 +99,30 @@ class Payment(models.Model):
         
         super().save(*args, **kwargs)
     
-    def _create_vendor_earning(self):
-        """Create vendor earning record when payment is completed"""
+    def _build_vendor_earning(self):
+        """Unsaved vendor earning record for this payment, or None if the order has no vendor"""
         from vendors.models import VendorEarning
         
-        if self.order.vendor:
-            vendor_earning = VendorEarning.objects.create(
-                vendor=self.order.vendor,
-                order=self.order,
-                payment=self,
-                earning_type='order',
-                gross_amount=self.amount,
-                commission_rate=self.commission_rate,
-                commission_amount=self.commission_amount,
-                net_amount=self.vendor_earnings,
-                status='pending',
-                description=f"Payment for order #{self.order.id}"
-            )
+        if not self.order.vendor_id:
+            return None
+        return VendorEarning(
+            vendor_id=self.order.vendor_id,
+            order=self.order,
+            payment=self,
+            earning_type='order',
+            gross_amount=self.amount,
+            commission_rate=self.commission_rate,
+            commission_amount=self.commission_amount,
+            net_amount=self.vendor_earnings,
+            status='pending',
+            description=f"Payment for order #{self.order.id}"
+        )
+    
+    def _create_vendor_earning(self):
+        """Create vendor earning record when payment is completed"""
+        vendor_earning = self._build_vendor_earning()
+        if vendor_earning is not None:
+            vendor_earning.save()
             self.vendor_earning = vendor_earning
             self.payout_status = 'processed'
     
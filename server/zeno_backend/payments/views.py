@@ -8,7 +8,9 @@ from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Sum, Count, Avg, Q
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, Avg, Q, Value
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 
 from .models import Payment, MpesaConfiguration, PayoutRequest, CommissionSummary, PaymentWebhookLog
@@ -34,6 +36,56 @@ class IsVendorUser(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.user_type in ['vendor', 'mechanic']
 
+# ========== PAYOUT HELPERS ==========
+
+def _payout_idempotency_key(payout_request):
+    """One payout transaction per payout request, however often processing is retried"""
+    return f"payout_request:{payout_request.pk}"
+
+def _claim_payout_request(payout_request):
+    """
+    Move an approved payout request to processing with a conditional UPDATE;
+    returns False if another call got there first. Claiming before M-Pesa is
+    called keeps concurrent retries from sending the same payout twice.
+    """
+    now = timezone.now()
+    # Same timestamps PayoutRequest.save() would set for the processing state
+    claimed = PayoutRequest.objects.filter(pk=payout_request.pk, status='approved').update(
+        status='processing', processed_at=Coalesce('processed_at', Value(now)), updated_at=now
+    )
+    if claimed:
+        payout_request.status = 'processing'
+        payout_request.processed_at = payout_request.processed_at or now
+    return bool(claimed)
+
+def _record_payout_transaction(payout_request, payout_reference, b2c_response):
+    """
+    Insert the payout transaction for payout_request; returns (transaction, created).
+    A duplicate is rejected by the payout_idem_uq constraint during the INSERT,
+    without a pre-check SELECT, and the existing row is returned instead.
+    """
+    idempotency_key = _payout_idempotency_key(payout_request)
+    try:
+        with transaction.atomic():
+            payout_transaction = PayoutTransaction.objects.create(
+                vendor=payout_request.vendor,
+                payout_method='mpesa',
+                payout_reference=payout_reference,
+                idempotency_key=idempotency_key,
+                amount=payout_request.amount,
+                status='processing',
+                recipient_details={
+                    'phone_number': payout_request.recipient_number,
+                    'recipient_name': payout_request.recipient_name
+                },
+                gateway_response=b2c_response
+            )
+        return payout_transaction, True
+    except IntegrityError:
+        return PayoutTransaction.objects.get(
+            vendor_id=payout_request.vendor_id, idempotency_key=idempotency_key
+        ), False
+
 # ========== SERVICE CLASSES ==========
 
 class MpesaService:
@@ -272,6 +324,18 @@ class PayoutRequestViewSet(viewsets.ModelViewSet):
         payout_request = self.get_object()
         
         if payout_request.status != 'approved':
+            # A retry of a request that was already processed replays the original result
+            payout_transaction = PayoutTransaction.objects.filter(
+                vendor_id=payout_request.vendor_id,
+                idempotency_key=_payout_idempotency_key(payout_request)
+            ).first()
+            if payout_transaction is not None:
+                return Response({
+                    'message': 'Payout already initiated via M-Pesa B2C',
+                    'payout_reference': payout_transaction.payout_reference,
+                    'transaction_id': (payout_transaction.gateway_response or {}).get('ConversationID'),
+                    'payout_request': PayoutRequestSerializer(payout_request).data
+                })
             return Response(
                 {'error': 'Can only process approved payout requests'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -283,6 +347,12 @@ class PayoutRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        if not _claim_payout_request(payout_request):
+            return Response(
+                {'error': 'Payout request is already being processed'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
         try:
             # Initialize M-Pesa service
             mpesa_service = MpesaService()
@@ -297,29 +367,17 @@ class PayoutRequestViewSet(viewsets.ModelViewSet):
                 payout_reference=payout_reference
             )
             
-            # Update payout request status
-            payout_request.status = 'processing'
-            payout_request.save()
-            
             # Create payout transaction record
-            payout_transaction = PayoutTransaction.objects.create(
-                vendor=payout_request.vendor,
-                payout_method='mpesa',
-                payout_reference=payout_reference,
-                amount=payout_request.amount,
-                status='processing',
-                recipient_details={
-                    'phone_number': payout_request.recipient_number,
-                    'recipient_name': payout_request.recipient_name
-                },
-                gateway_response=b2c_response
+            payout_transaction, created = _record_payout_transaction(
+                payout_request, payout_reference, b2c_response
             )
             
             # Update vendor balance immediately (will be confirmed by webhook)
-            vendor = payout_request.vendor
-            vendor.available_balance -= payout_request.amount
-            vendor.pending_payouts += payout_request.amount
-            vendor.save()
+            if created:
+                payout_request.vendor.adjust_balances(
+                    available_balance=-payout_request.amount,
+                    pending_payouts=payout_request.amount,
+                )
             
             return Response({
                 'message': 'Payout processing initiated via M-Pesa B2C',
@@ -526,10 +584,10 @@ def _handle_stk_callback(callback_data, webhook_log):
             payment._create_vendor_earning()
             
             # Update vendor's available balance
-            vendor = payment.order.vendor
-            vendor.available_balance += payment.vendor_earnings
-            vendor.total_earnings += payment.vendor_earnings
-            vendor.save()
+            payment.order.vendor.adjust_balances(
+                available_balance=payment.vendor_earnings,
+                total_earnings=payment.vendor_earnings,
+            )
         
         webhook_log.processed_successfully = True
         webhook_log.payment = payment
@@ -569,9 +627,10 @@ def _handle_b2c_callback(callback_data, webhook_log):
             
             # Update vendor balances
             vendor = payout_transaction.vendor
-            vendor.pending_payouts -= payout_transaction.amount
-            vendor.total_paid_out += payout_transaction.amount
-            vendor.save()
+            vendor.adjust_balances(
+                pending_payouts=-payout_transaction.amount,
+                total_paid_out=payout_transaction.amount,
+            )
             
             # Update related payout request
             payout_request = PayoutRequest.objects.filter(
@@ -595,10 +654,10 @@ def _handle_b2c_callback(callback_data, webhook_log):
             payout_transaction.gateway_response = callback_data
             
             # Revert vendor balances
-            vendor = payout_transaction.vendor
-            vendor.available_balance += payout_transaction.amount
-            vendor.pending_payouts -= payout_transaction.amount
-            vendor.save()
+            payout_transaction.vendor.adjust_balances(
+                available_balance=payout_transaction.amount,
+                pending_payouts=-payout_transaction.amount,
+            )
             
             webhook_log.processed_successfully = False
             webhook_log.error_message = f"B2C payout failed with result code: {result_code}"
@@ -765,6 +824,13 @@ def bulk_process_payouts(request):
                 })
                 continue
             
+            if not _claim_payout_request(payout_request):
+                results['failed'].append({
+                    'id': payout_request.id,
+                    'error': 'Already being processed'
+                })
+                continue
+            
             # Generate unique reference
             payout_reference = f"ZENO_BULK_{payout_request.id}_{int(timezone.now().timestamp())}"
             
@@ -775,29 +841,17 @@ def bulk_process_payouts(request):
                 payout_reference=payout_reference
             )
             
-            # Update payout request status
-            payout_request.status = 'processing'
-            payout_request.save()
-            
             # Create payout transaction record
-            payout_transaction = PayoutTransaction.objects.create(
-                vendor=payout_request.vendor,
-                payout_method='mpesa',
-                payout_reference=payout_reference,
-                amount=payout_request.amount,
-                status='processing',
-                recipient_details={
-                    'phone_number': payout_request.recipient_number,
-                    'recipient_name': payout_request.recipient_name
-                },
-                gateway_response=b2c_response
+            payout_transaction, created = _record_payout_transaction(
+                payout_request, payout_reference, b2c_response
             )
             
             # Update vendor balance immediately
-            vendor = payout_request.vendor
-            vendor.available_balance -= payout_request.amount
-            vendor.pending_payouts += payout_request.amount
-            vendor.save()
+            if created:
+                payout_request.vendor.adjust_balances(
+                    available_balance=-payout_request.amount,
+                    pending_payouts=payout_request.amount,
+                )
             
             results['successful'].append({
                 'id': payout_request.id,
@@ -808,6 +862,11 @@ def bulk_process_payouts(request):
             })
             
         except Exception as e:
+            # Same as the single-request process action: a claimed request that
+            # errored is marked failed rather than left in processing
+            PayoutRequest.objects.filter(pk=payout_request.pk, status='processing').update(
+                status='failed', updated_at=timezone.now()
+            )
             results['failed'].append({
                 'id': payout_request.id,
                 'error': str(e)
@@ -1,6 +1,9 @@
 # users/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.cache import cache
+from django.utils import timezone
+from .authentication import user_cache_key
 from .models import User
 
 @admin.register(User)
@@ -26,10 +29,16 @@ class CustomUserAdmin(UserAdmin):
     
     actions = ['verify_users', 'unverify_users']
     
+    def _set_verified(self, queryset, is_verified):
+        # queryset.update() skips User.save(), so the cached JWT users go by hand
+        user_ids = list(queryset.values_list('pk', flat=True))
+        queryset.update(is_verified=is_verified, updated_at=timezone.now())
+        cache.delete_many([user_cache_key(pk) for pk in user_ids])
+
     def verify_users(self, request, queryset):
-        queryset.update(is_verified=True)
+        self._set_verified(queryset, True)
     verify_users.short_description = "Mark selected users as verified"
     
     def unverify_users(self, request, queryset):
-        queryset.update(is_verified=False)
+        self._set_verified(queryset, False)
     unverify_users.short_description = "Mark selected users as unverified"
\ No newline at end of file
@@ -0,0 +1,79 @@
+# users/authentication.py
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_CACHE_TIMEOUT = 60
+
+# 'purpose' claim of the short-lived access tokens issued by VerifyResetCodeView
+RESET_TOKEN_PURPOSE = 'pw_reset'
+
+
+def user_cache_key(user_id):
+    return f"jwt:user:{user_id}"
+
+
+def denylist_cache_key(jti):
+    return f"jwt:blacklist:{jti}"
+
+
+def denylist_token(token):
+    """Reject token (by jti) in the cache until it would have expired anyway"""
+    remaining = int(token['exp'] - timezone.now().timestamp())
+    if remaining > 0:
+        cache.set(denylist_cache_key(token[api_settings.JTI_CLAIM]), 1, remaining)
+
+
+def is_denylisted(token):
+    return bool(cache.get(denylist_cache_key(token[api_settings.JTI_CLAIM])))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the per-request user lookup and the
+    logout denylist check in the cache instead of the database. Both keys
+    are read with a single get_many, so an authenticated request costs one
+    cache round-trip.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        # Reset tokens only unlock ResetPasswordView, not the rest of the API
+        if validated_token.get('purpose') == RESET_TOKEN_PURPOSE:
+            raise InvalidToken('Token not valid for authentication')
+
+        denylist_key = denylist_cache_key(validated_token[api_settings.JTI_CLAIM])
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        keys = [denylist_key] if user_id is None else [denylist_key, user_cache_key(user_id)]
+        found = cache.get_many(keys)
+        if found.get(denylist_key):
+            raise InvalidToken('Token has been revoked')
+
+        # DRF builds an authenticator per request, so this can't leak across users
+        self._cached_user = found.get(keys[-1]) if user_id is not None else None
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        user = getattr(self, '_cached_user', None)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
+
+
+class DenylistTokenRefreshSerializer(TokenRefreshSerializer):
+    """TokenRefreshSerializer that refuses refresh tokens revoked at logout"""
+
+    def validate(self, attrs):
+        if is_denylisted(RefreshToken(attrs['refresh'])):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
@@ -1,9 +1,10 @@
 # users/models.py
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
 from django.utils import timezone
-import random
-import string
+from django.utils.crypto import constant_time_compare, salted_hmac
+import secrets
 
 class User(AbstractUser):
     USER_TYPES = (
@@ -25,7 +26,8 @@ class User(AbstractUser):
     profile_picture = models.ImageField(upload_to='profile_pictures/', null=True, blank=True)
     is_verified = models.BooleanField(default=False)
     phone_verified = models.BooleanField(default=False)
-    otp = models.CharField(max_length=6, blank=True, null=True)
+    # HMAC-SHA256 hex digest of the active code (see hash_otp), never the code itself
+    otp = models.CharField(max_length=64, blank=True, null=True)
     otp_created_at = models.DateTimeField(null=True, blank=True)
     preferred_otp_channel = models.CharField(
         max_length=10,
@@ -39,30 +41,65 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.email} ({self.user_type})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Drop the copy cached by CachedJWTAuthentication so requests see the change
+        from .authentication import user_cache_key
+        cache.delete(user_cache_key(self.pk))
+
+    def delete(self, *args, **kwargs):
+        from .authentication import user_cache_key
+        cache.delete(user_cache_key(self.pk))
+        return super().delete(*args, **kwargs)
+
+    @staticmethod
+    def hash_otp(otp):
+        """Keyed digest stored in place of the OTP, so a leaked row doesn't leak a live code"""
+        return salted_hmac('users.User.otp', otp).hexdigest()
+
     def generate_otp(self):
-        """Generate a 6-digit OTP"""
-        otp = ''.join(random.choices(string.digits, k=6))
-        self.otp = otp
+        """Generate a 6-digit OTP; returns the plain code for delivery"""
+        from .authentication import user_cache_key
+        
+        otp = f"{secrets.randbelow(1_000_000):06d}"
+        self.otp = self.hash_otp(otp)
         self.otp_created_at = timezone.now()
-        self.save()
+        # Single two-column UPDATE, skipping the save() machinery; the cached
+        # JWT user still has to go, or a later full save() would write it back
+        User.objects.filter(pk=self.pk).update(otp=self.otp, otp_created_at=self.otp_created_at)
+        cache.delete(user_cache_key(self.pk))
         return otp
 
-    def verify_otp(self, otp):
-        """Verify OTP and mark phone as verified if successful"""
-        from django.utils import timezone
+    def check_otp(self, otp):
+        """True if otp matches the active, unexpired code (compared in constant time)"""
         from datetime import timedelta
         from django.conf import settings
         
-        if (self.otp == otp and 
-            self.otp_created_at and 
-            timezone.now() - self.otp_created_at < timedelta(minutes=getattr(settings, 'OTP_EXPIRY_MINUTES', 10))):
+        return bool(
+            self.otp and
+            self.otp_created_at and
+            timezone.now() - self.otp_created_at < timedelta(minutes=getattr(settings, 'OTP_EXPIRY_MINUTES', 10)) and
+            constant_time_compare(self.otp, self.hash_otp(otp))
+        )
+
+    def verify_otp(self, otp):
+        """Verify OTP and mark phone as verified if successful"""
+        if self.check_otp(otp) and self.claim_otp(otp):
             self.phone_verified = True
             self.otp = None
             self.otp_created_at = None
-            self.save()
+            self.save(update_fields=['phone_verified', 'otp', 'otp_created_at', 'updated_at'])
             return True
         return False
 
+    def claim_otp(self, otp):
+        """Mark otp as used; False if another request already consumed it"""
+        from django.conf import settings
+        
+        # cache.add is atomic, so concurrent replays of the same code can't both win
+        timeout = getattr(settings, 'OTP_EXPIRY_MINUTES', 10) * 60
+        return cache.add(f"otp:used:{self.pk}:{self.hash_otp(otp)}", 1, timeout)
+
     def get_preferred_otp_channel_display(self):
         """Get human-readable preferred OTP channel"""
         return dict(self.OTP_CHOICES).get(self.preferred_otp_channel, 'WhatsApp')
@@ -82,4 +119,8 @@ class User(AbstractUser):
             return None
 
     class Meta:
-        db_table = 'users'
\ No newline at end of file
+        db_table = 'users'
+        indexes = [
+            # Login, OTP and password-reset flows all look users up by phone
+            models.Index(fields=['phone_number']),
+        ]
\ No newline at end of file
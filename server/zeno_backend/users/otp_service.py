@@ -1,5 +1,6 @@
 # users/otp_service.py
 import os
+from functools import lru_cache
 from twilio.rest import Client
 from django.conf import settings
 import logging
@@ -139,7 +140,9 @@ class DevelopmentOTPService:
             'details': {'simulated': True, 'message': 'Voice OTP would be sent'}
         }
 
-# Use appropriate service based on environment
+# Use appropriate service based on environment. Memoised so every send
+# reuses one Twilio client (and its keep-alive HTTP session).
+@lru_cache(maxsize=None)
 def get_otp_service():
     if settings.DEBUG and not all([settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN]):
         return DevelopmentOTPService()
@@ -1,6 +1,5 @@
 from django.core.cache import cache
 from django.utils import timezone
-from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,64 +8,69 @@ class OTPRateLimiter:
     def __init__(self):
         self.limit = 3  # Max 3 requests per hour
         self.window = 3600  # 1 hour in seconds
-    
+
     def _get_cache_key(self, phone_number):
-        """Generate cache key for rate limiting"""
-        return f"otp_rate_limit:{phone_number}"
-    
+        """
+        Generate cache key for rate limiting
+        Returns: (cache_key, seconds until the current window resets)
+        """
+        # Fixed windows: the key embeds the window number, so a single counter
+        # per phone is enough and the reset time needs no extra cache read
+        now = int(timezone.now().timestamp())
+        window_number, elapsed = divmod(now, self.window)
+        return f"otp_rate_limit:{phone_number}:{window_number}", self.window - elapsed
+
+    def _increment(self, cache_key):
+        """Atomically bump the counter for cache_key and return the new count"""
+        if cache.add(cache_key, 1, self.window):
+            return 1
+        try:
+            return cache.incr(cache_key)
+        except ValueError:
+            # Expired between add() and incr(); this is the window's first request
+            cache.add(cache_key, 1, self.window)
+            return 1
+
     def is_rate_limited(self, phone_number):
         """
         Check if phone number has exceeded rate limit
         Returns: (is_limited, retry_after_seconds)
         """
-        cache_key = self._get_cache_key(phone_number)
-        requests_data = cache.get(cache_key, [])
-        
-        # Remove expired timestamps (older than 1 hour)
-        now = timezone.now()
-        cutoff_time = now - timedelta(seconds=self.window)
-        valid_requests = [ts for ts in requests_data if ts > cutoff_time]
-        
-        # Check if limit exceeded
-        if len(valid_requests) >= self.limit:
-            # Calculate when the oldest request will expire
-            if valid_requests:
-                oldest_request = min(valid_requests)
-                retry_after = int((oldest_request + timedelta(seconds=self.window) - now).total_seconds())
-                return True, max(0, retry_after)
-            return True, self.window
-        
+        cache_key, retry_after = self._get_cache_key(phone_number)
+        if cache.get(cache_key, 0) >= self.limit:
+            return True, retry_after
         return False, 0
-    
+
+    def check_and_record(self, phone_number):
+        """
+        Check the limit and record the request in one atomic step, so concurrent
+        requests can't all pass the check before any of them is recorded
+        Returns: (is_limited, retry_after_seconds, remaining_attempts)
+        """
+        cache_key, retry_after = self._get_cache_key(phone_number)
+        count = self._increment(cache_key)
+
+        if count > self.limit:
+            return True, retry_after, 0
+
+        logger.info(f"OTP request recorded for {phone_number}. {count}/{self.limit} requests in last hour.")
+        return False, 0, self.limit - count
+
     def record_request(self, phone_number):
-        """Record an OTP request for rate limiting"""
-        cache_key = self._get_cache_key(phone_number)
-        requests_data = cache.get(cache_key, [])
-        
-        now = timezone.now()
-        requests_data.append(now)
-        
-        # Keep only requests from the last hour
-        cutoff_time = now - timedelta(seconds=self.window)
-        valid_requests = [ts for ts in requests_data if ts > cutoff_time]
-        
-        # Store in cache with expiration
-        cache.set(cache_key, valid_requests, self.window)
-        
-        logger.info(f"OTP request recorded for {phone_number}. {len(valid_requests)}/{self.limit} requests in last hour.")
-    
+        """
+        Record an OTP request for rate limiting
+        Returns: remaining attempts, so callers don't need another cache read
+        """
+        cache_key, _ = self._get_cache_key(phone_number)
+        count = self._increment(cache_key)
+
+        logger.info(f"OTP request recorded for {phone_number}. {count}/{self.limit} requests in last hour.")
+        return max(0, self.limit - count)
+
     def get_remaining_attempts(self, phone_number):
         """Get remaining OTP attempts for phone number"""
-        cache_key = self._get_cache_key(phone_number)
-        requests_data = cache.get(cache_key, [])
-        
-        # Remove expired timestamps
-        now = timezone.now()
-        cutoff_time = now - timedelta(seconds=self.window)
-        valid_requests = [ts for ts in requests_data if ts > cutoff_time]
-        
-        remaining = self.limit - len(valid_requests)
-        return max(0, remaining)
+        cache_key, _ = self._get_cache_key(phone_number)
+        return max(0, self.limit - cache.get(cache_key, 0))
 
 # Global instance
-otp_rate_limiter = OTPRateLimiter()
\ No newline at end of file
+otp_rate_limiter = OTPRateLimiter()
@@ -1,6 +1,9 @@
 # users/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.core.validators import MinLengthValidator
+from django.db.models import prefetch_related_objects
+from django.db.models.manager import BaseManager
 from django.utils import timezone
 from .models import User
 from vendors.models import Vendor, VendorPayoutPreference, VendorPerformance
@@ -8,6 +11,11 @@ from .otp_service import get_otp_service
 import phonenumbers
 from phonenumbers import NumberParseException
 
+# Shared across every password field so the length check is built once
+_PW_VALIDATORS = [MinLengthValidator(6)]
+
+_OTP_CHANNEL_CHOICES = (('whatsapp', 'WhatsApp'), ('voice', 'Voice Call'), ('sms', 'SMS'))
+
 class VendorRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for vendor-specific registration data"""
     class Meta:
@@ -26,10 +34,10 @@ class VendorRegistrationSerializer(serializers.ModelSerializer):
         }
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
-    password = serializers.CharField(write_only=True, min_length=6)
-    password_confirm = serializers.CharField(write_only=True, min_length=6)
+    password = serializers.CharField(write_only=True, validators=_PW_VALIDATORS)
+    password_confirm = serializers.CharField(write_only=True, validators=_PW_VALIDATORS)
     preferred_otp_channel = serializers.ChoiceField(
-        choices=[('whatsapp', 'WhatsApp'), ('voice', 'Voice Call'), ('sms', 'SMS')],
+        choices=_OTP_CHANNEL_CHOICES,
         required=False,
         default='whatsapp',
         help_text="Preferred OTP delivery method: whatsapp, voice, or sms"
@@ -66,7 +74,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         user_type = attrs.get('user_type')
         vendor_data = attrs.get('vendor_data')
         
-        if user_type in ['vendor', 'mechanic'] and not vendor_data:
+        if user_type in ('vendor', 'mechanic') and not vendor_data:
             raise serializers.ValidationError({
                 "vendor_data": "Vendor business information is required for vendor/mechanic registration."
             })
@@ -104,10 +112,10 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         
         # Store user's preferred OTP channel
         user.preferred_otp_channel = preferred_channel
-        user.save()
+        user.save(update_fields=['preferred_otp_channel', 'updated_at'])
         
         # Create vendor profile if user is vendor/mechanic
-        if user.user_type in ['vendor', 'mechanic'] and vendor_data:
+        if user.user_type in ('vendor', 'mechanic') and vendor_data:
             self.create_vendor_profile(user, vendor_data)
         
         # Generate and send OTP using preferred channel
@@ -168,30 +176,19 @@ class UserLoginSerializer(serializers.Serializer):
         password = data.get('password')
         
         if phone_number and password:
-            try:
-                print(f"Attempting login with phone: {phone_number}")  # Debug
-                
-                # Try direct authentication first
-                user = authenticate(username=phone_number, password=password)
-                print(f"Direct auth result: {user}")  # Debug
-                
-                if user is None:
-                    # Fallback: find by phone and authenticate with username
-                    user_obj = User.objects.get(phone_number=phone_number)
-                    print(f"Found user by phone: {user_obj.username}")  # Debug
-                    user = authenticate(username=user_obj.username, password=password)
-                    print(f"Username auth result: {user}")  # Debug
-                
-                if user:
-                    if user.is_active:
-                        data['user'] = user
-                    else:
-                        raise serializers.ValidationError('User account is disabled.')
+            # Resolve the username up front so the password hash is only
+            # verified once, even for users whose username is not the phone
+            username = User.objects.filter(phone_number=phone_number).values_list(
+                'username', flat=True
+            ).first()
+            user = authenticate(username=username or phone_number, password=password)
+
+            if user:
+                if user.is_active:
+                    data['user'] = user
                 else:
-                    raise serializers.ValidationError('Unable to login with provided credentials.')
-                    
-            except User.DoesNotExist:
-                print(f"No user found with phone: {phone_number}")  # Debug
+                    raise serializers.ValidationError('User account is disabled.')
+            else:
                 raise serializers.ValidationError('Unable to login with provided credentials.')
         else:
             raise serializers.ValidationError('Must include phone number and password.')
@@ -216,7 +213,7 @@ class VerifyOTPSerializer(serializers.Serializer):
 class ResendOTPSerializer(serializers.Serializer):
     phone_number = serializers.CharField()
     preferred_channel = serializers.ChoiceField(
-        choices=[('whatsapp', 'WhatsApp'), ('voice', 'Voice Call'), ('sms', 'SMS')],
+        choices=_OTP_CHANNEL_CHOICES,
         required=False,
         help_text="Optional: Override user's preferred OTP channel for this resend"
     )
@@ -230,6 +227,15 @@ class ResendOTPSerializer(serializers.Serializer):
         
         return data
 
+class UserProfileListSerializer(serializers.ListSerializer):
+    """Resolves has_vendor_profile for every user in the list with one query"""
+
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, BaseManager) else data)
+        # No-op for users whose vendor_profile was already select_related
+        prefetch_related_objects(users, 'vendor_profile')
+        return super().to_representation(users)
+
 class UserProfileSerializer(serializers.ModelSerializer):
     preferred_otp_channel = serializers.CharField(source='get_preferred_otp_channel_display', read_only=True)
     has_vendor_profile = serializers.BooleanField(read_only=True)
@@ -241,10 +247,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
                  'is_verified', 'phone_verified', 'date_joined', 'preferred_otp_channel',
                  'has_vendor_profile')
         read_only_fields = ('id', 'email', 'date_joined', 'preferred_otp_channel', 'has_vendor_profile')
+        list_serializer_class = UserProfileListSerializer
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     preferred_otp_channel = serializers.ChoiceField(
-        choices=[('whatsapp', 'WhatsApp'), ('voice', 'Voice Call'), ('sms', 'SMS')],
+        choices=_OTP_CHANNEL_CHOICES,
         required=False
     )
 
@@ -253,20 +260,37 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         fields = ('username', 'first_name', 'last_name', 'phone_number', 'location', 'profile_picture', 'preferred_otp_channel')
         read_only_fields = ('email', 'user_type', 'is_verified', 'phone_verified', 'date_joined')
 
+    def to_representation(self, instance):
+        # Respond with the profile shape so views can return serializer.data
+        # instead of serializing the saved user a second time
+        return UserProfileSerializer(instance, context=self.context).data
+
 class ChangePasswordSerializer(serializers.Serializer):
+    """Change the requesting user's password; expects the request in context"""
     old_password = serializers.CharField(required=True)
-    new_password1 = serializers.CharField(required=True, min_length=6)
-    new_password2 = serializers.CharField(required=True, min_length=6)
+    new_password1 = serializers.CharField(required=True, validators=_PW_VALIDATORS)
+    new_password2 = serializers.CharField(required=True, validators=_PW_VALIDATORS)
+
+    def validate_old_password(self, value):
+        if not self.context['request'].user.check_password(value):
+            raise serializers.ValidationError('Current password is incorrect')
+        return value
 
     def validate(self, data):
         if data['new_password1'] != data['new_password2']:
             raise serializers.ValidationError("New passwords don't match")
         return data
 
+    def save(self, **kwargs):
+        user = self.context['request'].user
+        user.set_password(self.validated_data['new_password1'])
+        user.save(update_fields=['password'])
+        return user
+
 class ForgotPasswordSerializer(serializers.Serializer):
     phone_number = serializers.CharField(required=True)
     preferred_channel = serializers.ChoiceField(
-        choices=[('whatsapp', 'WhatsApp'), ('voice', 'Voice Call'), ('sms', 'SMS')],
+        choices=_OTP_CHANNEL_CHOICES,
         required=False,
         help_text="Preferred OTP delivery method for password reset"
     )
@@ -277,8 +301,8 @@ class VerifyResetCodeSerializer(serializers.Serializer):
 
 class ResetPasswordSerializer(serializers.Serializer):
     reset_token = serializers.CharField(required=True)
-    new_password = serializers.CharField(required=True, min_length=6)
-    confirm_password = serializers.CharField(required=True, min_length=6)
+    new_password = serializers.CharField(required=True, validators=_PW_VALIDATORS)
+    confirm_password = serializers.CharField(required=True, validators=_PW_VALIDATORS)
 
     def validate(self, data):
         if data['new_password'] != data['confirm_password']:
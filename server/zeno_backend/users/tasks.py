@@ -0,0 +1,75 @@
+# users/tasks.py
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connections, transaction
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from .otp_service import get_otp_service
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Network-bound work (voice/SMS/email providers) runs here instead of on the
+# request thread, so the client gets its response without waiting on the provider
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='users-tasks')
+
+# Password reset emails are retried on transient SMTP/connection errors,
+# waiting 1s then 2s between attempts
+EMAIL_MAX_ATTEMPTS = 3
+EMAIL_RETRY_BASE_DELAY = 1
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background task {func.__name__} failed")
+    finally:
+        # Worker threads get their own DB connections; don't leak them
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Queue func once the current transaction (if any) has committed"""
+    transaction.on_commit(lambda: _executor.submit(_run, func, args, kwargs))
+
+
+def send_otp_task(phone_number, otp, preferred_channel=None):
+    """Deliver an OTP through the configured provider"""
+    result = get_otp_service().send_otp(phone_number, otp, preferred_channel)
+    if not result['success']:
+        logger.error(f"OTP delivery failed for {phone_number}: {result.get('channels_attempted')}")
+    return result
+
+
+def send_password_reset_email(email, reset_token):
+    """Email a password reset code, retrying transient failures with backoff"""
+    for attempt in range(1, EMAIL_MAX_ATTEMPTS + 1):
+        try:
+            send_mail(
+                'Password Reset Request - Zeno Roadside Connect',
+                f'Your password reset code is: {reset_token}. This code expires in 10 minutes.',
+                settings.DEFAULT_FROM_EMAIL,
+                [email],
+                fail_silently=False,
+            )
+            return
+        except OSError:
+            # smtplib.SMTPException subclasses OSError, as do socket/connection errors.
+            # The last failure propagates to _run(), which logs it
+            if attempt == EMAIL_MAX_ATTEMPTS:
+                raise
+            delay = EMAIL_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+            logger.warning(f"Password reset email to {email} failed (attempt {attempt}); retrying in {delay}s")
+            time.sleep(delay)
+
+
+def blacklist_refresh_token(refresh_token):
+    """Persist a logged-out refresh token to simplejwt's blacklist table"""
+    try:
+        RefreshToken(refresh_token).blacklist()
+    except TokenError:
+        # Expired between logout and now; nothing left to revoke
+        pass
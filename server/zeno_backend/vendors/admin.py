@@ -1,15 +1,144 @@
 # vendors/admin.py
+import json
 from django.contrib import admin
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.core.paginator import Paginator
+from django.db import connections
+from django.forms.models import BaseInlineFormSet
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.html import format_html
-from django.db.models import Sum, Count, Avg
+from django.utils.safestring import mark_safe
+from django.db.models import Sum, Count, Avg, Exists, OuterRef, Q, Value
+from django.db.models.functions import Coalesce, TruncDate
 from .models import (
     Vendor, GasProduct, GasProductImage, GasPriceHistory, 
     VendorReview, OperatingHours, VendorPayoutPreference, 
     VendorEarning, PayoutTransaction, VendorPerformance
 )
 
+# ========== HTML TEMPLATES ==========
+# Built once at import. Values are formatted before they are passed to
+# format_html, which escapes each argument and fills the {} slots.
+
+_FINANCIAL_SUMMARY_HTML = """
+<div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
+    <strong>Financial Summary:</strong><br>
+    Total Earnings: KES {}<br>
+    Available Balance: KES {}<br>
+    Pending Payouts: KES {}<br>
+    Total Paid Out: KES {}
+</div>
+"""
+
+_PERFORMANCE_SUMMARY_HTML = """
+<div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
+    <strong>Performance Summary:</strong><br>
+    Total Orders: {}<br>
+    Completed Orders: {}<br>
+    Active Customers: {}<br>
+    Completion Rate: {}%
+</div>
+"""
+
+_PAYOUT_DETAILS_HTML = """
+<div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
+    <strong>Payout Details:</strong><br>
+    Method: {}<br>
+    Amount: KES {}<br>
+    Status: {}<br>
+    Reference: {}
+</div>
+"""
+
+_PERFORMANCE_METRICS_HTML = """
+<div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
+    <strong>Performance Metrics:</strong><br>
+    Completion Rate: {}%<br>
+    Cancellation Rate: {}%<br>
+    Average Order Value: KES {}<br>
+    Repeat Customers: {}<br>
+    Satisfaction Score: {}/5
+</div>
+"""
+
+
+# Review ratings are bounded 0..5, so every possible star bar is built once
+_STAR_HTML = tuple(
+    mark_safe(f'<span style="color: gold;">{"★" * i}{"☆" * (5 - i)}</span>')
+    for i in range(6)
+)
+
+
+# ========== MONEY FORMATTING ==========
+
+def _kes(amount):
+    """Render a money column as 'KES 1,234.50'; blank amounts show as zero"""
+    # Stays Decimal: a float round-trip can misround cents on large balances
+    return 'KES ' + format(amount if amount is not None else 0, ',.2f')
+
+
+# ========== CHOICE LABELS ==========
+# get_FOO_display() rebuilds a dict from the field's choices on every call;
+# changelists call it once per row, so build the lookups once at import
+
+_DAY_LABELS = OperatingHours._DAY_LABELS
+_PAYOUT_METHOD_LABELS = dict(VendorPayoutPreference.PAYOUT_METHODS)
+
+
+# ========== QUERYSET HELPERS ==========
+
+def _is_changelist(request):
+    """True for changelist requests (including actions posted from it)"""
+    match = request.resolver_match
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
+
+
+# ========== PAGINATION ==========
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for append-only ledger tables. An unfiltered changelist takes its
+    row count from PostgreSQL's planner estimate (pg_class.reltuples) instead of
+    a COUNT(*) over the whole table; filtered or searched lists count exactly.
+    """
+    # Below this an exact COUNT(*) is cheap, and the estimate can be stale
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            with connections[queryset.db].cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 for a table that has never been analyzed
+            if row and row[0] >= self.exact_count_threshold:
+                return row[0]
+        return super().count
+
+
 # ========== INLINE ADMIN CLASSES ==========
 
+class RecentRowsInlineFormSet(BaseInlineFormSet):
+    """
+    Inline formset that renders only the newest `max_rows` related rows, so a
+    vendor with years of history doesn't pull every row into the change page.
+    The full history stays available on the model's own changelist.
+    """
+    max_rows = 25
+
+    def get_queryset(self):
+        # The slice has to happen here, after the formset filters by the
+        # parent vendor; a sliced queryset from the inline can't be filtered
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:self.max_rows]
+        return self._queryset
+
 class GasProductInline(admin.TabularInline):
     model = GasProduct
     extra = 0
@@ -22,8 +151,15 @@ class VendorReviewInline(admin.TabularInline):
     extra = 0
     fields = ['customer', 'rating', 'comment', 'created_at']
     readonly_fields = ['created_at']
+    # A customer <select> per review row would load the whole users table each time
+    raw_id_fields = ['customer']
+    formset = RecentRowsInlineFormSet
     classes = ['collapse']
 
+    def get_queryset(self, request):
+        # VendorReview has no default ordering; show the newest first
+        return super().get_queryset(request).select_related('customer').order_by('-created_at')
+
 class OperatingHoursInline(admin.TabularInline):
     model = OperatingHours
     extra = 7  # One for each day
@@ -35,6 +171,7 @@ class VendorEarningInline(admin.TabularInline):
     extra = 0
     fields = ['earning_type', 'gross_amount', 'commission_amount', 'net_amount', 'status', 'created_at']
     readonly_fields = ['created_at']
+    formset = RecentRowsInlineFormSet
     classes = ['collapse']
 
 class PayoutTransactionInline(admin.TabularInline):
@@ -42,6 +179,7 @@ class PayoutTransactionInline(admin.TabularInline):
     extra = 0
     fields = ['payout_reference', 'amount', 'status', 'initiated_at']
     readonly_fields = ['initiated_at']
+    formset = RecentRowsInlineFormSet
     classes = ['collapse']
 
 # ========== MAIN ADMIN CLASSES ==========
@@ -50,7 +188,7 @@ class PayoutTransactionInline(admin.TabularInline):
 class VendorAdmin(admin.ModelAdmin):
     list_display = [
         'business_name', 'business_type', 'city', 'is_verified', 
-        'is_active', 'total_gas_products', 'total_earnings_display',
+        'is_active', 'total_gas_products_display', 'total_earnings_display',
         'available_balance_display', 'has_payout_preference_display'
     ]
     list_filter = [
@@ -60,6 +198,11 @@ class VendorAdmin(admin.ModelAdmin):
     search_fields = [
         'business_name', 'city', 'contact_number', 'email'
     ]
+    list_per_page = 50
+    list_max_show_all = 200
+    show_full_result_count = False
+    # A plain <select> would load every user into the change form
+    raw_id_fields = ['user']
     readonly_fields = [
         'average_rating', 'total_reviews', 'created_at', 'updated_at',
         'total_earnings', 'available_balance', 'pending_payouts', 
@@ -121,77 +264,107 @@ class VendorAdmin(admin.ModelAdmin):
     ]
     
     actions = [
-        'verify_vendors', 'deactivate_vendors', 'update_performance_metrics'
+        'toggle_verification', 'deactivate_vendors', 'update_performance_metrics'
     ]
 
+    # Columns the changelist renders, sorts on, or needs for Vendor.__str__
+    changelist_fields = [
+        'id', 'business_name', 'business_type', 'city', 'is_verified',
+        'is_active', 'total_earnings', 'available_balance', 'created_at'
+    ]
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # Skip description/address and the JSON preference blobs on the list;
+        # the change form still loads whole rows
+        if _is_changelist(request):
+            queryset = queryset.only(*self.changelist_fields)
+        # Resolve the per-row model properties for the whole page in the
+        # changelist query instead of a COUNT and a payout lookup per vendor
+        return queryset.annotate(
+            _total_gas_products=Count('gas_products', filter=Q(gas_products__is_active=True)),
+            _has_payout_preference=Exists(
+                VendorPayoutPreference.objects.filter(vendor=OuterRef('pk'), is_verified=True)
+            ),
+        )
+
+    def total_gas_products_display(self, obj):
+        return obj._total_gas_products
+    total_gas_products_display.short_description = 'Total Gas Products'
+    total_gas_products_display.admin_order_field = '_total_gas_products'
+
     def total_earnings_display(self, obj):
-        return f"KES {obj.total_earnings:,.2f}"
+        return _kes(obj.total_earnings)
     total_earnings_display.short_description = 'Total Earnings'
     total_earnings_display.admin_order_field = 'total_earnings'
 
     def available_balance_display(self, obj):
-        return f"KES {obj.available_balance:,.2f}"
+        return _kes(obj.available_balance)
     available_balance_display.short_description = 'Available Balance'
     available_balance_display.admin_order_field = 'available_balance'
 
     def has_payout_preference_display(self, obj):
-        if obj.has_payout_preference:
+        if obj._has_payout_preference:
             return format_html('<span style="color: green;">✓ Configured</span>')
         return format_html('<span style="color: red;">✗ Not Configured</span>')
     has_payout_preference_display.short_description = 'Payout Setup'
+    has_payout_preference_display.admin_order_field = '_has_payout_preference'
 
     def financial_summary(self, obj):
         return format_html(
-            """
-            <div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
-                <strong>Financial Summary:</strong><br>
-                Total Earnings: KES {total_earnings:,.2f}<br>
-                Available Balance: KES {available_balance:,.2f}<br>
-                Pending Payouts: KES {pending_payouts:,.2f}<br>
-                Total Paid Out: KES {total_paid_out:,.2f}
-            </div>
-            """.format(
-                total_earnings=obj.total_earnings,
-                available_balance=obj.available_balance,
-                pending_payouts=obj.pending_payouts,
-                total_paid_out=obj.total_paid_out
-            )
+            _FINANCIAL_SUMMARY_HTML,
+            f"{obj.total_earnings:,.2f}",
+            f"{obj.available_balance:,.2f}",
+            f"{obj.pending_payouts:,.2f}",
+            f"{obj.total_paid_out:,.2f}",
         )
     financial_summary.short_description = 'Financial Summary'
 
     def performance_summary(self, obj):
         return format_html(
-            """
-            <div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
-                <strong>Performance Summary:</strong><br>
-                Total Orders: {total_orders}<br>
-                Completed Orders: {completed_orders}<br>
-                Active Customers: {active_customers}<br>
-                Completion Rate: {completion_rate:.1f}%
-            </div>
-            """.format(
-                total_orders=obj.total_orders_count,
-                completed_orders=obj.completed_orders_count,
-                active_customers=obj.active_customers_count,
-                completion_rate=obj.order_completion_rate
-            )
+            _PERFORMANCE_SUMMARY_HTML,
+            obj.total_orders_count,
+            obj.completed_orders_count,
+            obj.active_customers_count,
+            f"{obj.order_completion_rate:.1f}",
         )
     performance_summary.short_description = 'Performance Summary'
 
-    def verify_vendors(self, request, queryset):
-        updated = queryset.update(is_verified=True)
-        self.message_user(request, f'{updated} vendors verified successfully.')
-    verify_vendors.short_description = "Verify selected vendors"
+    def toggle_verification(self, request, queryset):
+        vendors = list(queryset.only('id', 'business_name', 'business_type', 'is_verified'))
+        to_verify = [vendor.pk for vendor in vendors if not vendor.is_verified]
+        to_unverify = [vendor.pk for vendor in vendors if vendor.is_verified]
+
+        # One UPDATE per direction; update() skips auto_now, so stamp it here
+        now = timezone.now()
+        verified = Vendor.objects.filter(pk__in=to_verify).update(is_verified=True, updated_at=now)
+        unverified = Vendor.objects.filter(pk__in=to_unverify).update(is_verified=False, updated_at=now)
+
+        # Record the change in the admin history with a single INSERT
+        content_type = ContentType.objects.get_for_model(Vendor)
+        change_message = json.dumps([{'changed': {'fields': ['Is verified']}}])
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                user_id=request.user.pk,
+                content_type=content_type,
+                object_id=str(vendor.pk),
+                object_repr=str(vendor)[:200],
+                action_flag=CHANGE,
+                change_message=change_message,
+            )
+            for vendor in vendors
+        ])
+        self.message_user(request, f'{verified} vendors verified, {unverified} vendors unverified.')
+    toggle_verification.short_description = "Toggle verification of selected vendors"
 
     def deactivate_vendors(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
         self.message_user(request, f'{updated} vendors deactivated.')
     deactivate_vendors.short_description = "Deactivate selected vendors"
 
     def update_performance_metrics(self, request, queryset):
-        for vendor in queryset:
-            vendor.update_performance_metrics()
-        self.message_user(request, f'Performance metrics updated for {queryset.count()} vendors.')
+        vendors = queryset.update_performance_metrics()
+        self.message_user(request, f'Performance metrics updated for {len(vendors)} vendors.')
     update_performance_metrics.short_description = "Update performance metrics"
 
 @admin.register(VendorPayoutPreference)
@@ -209,7 +382,7 @@ class VendorPayoutPreferenceAdmin(admin.ModelAdmin):
     list_select_related = ['vendor']
 
     def payout_threshold_display(self, obj):
-        return f"KES {obj.payout_threshold:,.2f}"
+        return _kes(obj.payout_threshold)
     payout_threshold_display.short_description = 'Payout Threshold'
 
     def payout_details_summary_display(self, obj):
@@ -233,36 +406,51 @@ class VendorEarningAdmin(admin.ModelAdmin):
     ]
     date_hierarchy = 'created_at'
     list_select_related = ['vendor', 'order']
+    list_per_page = 50
+    list_max_show_all = 200
+    paginator = EstimatedCountPaginator
+    # The "N total" link would run a second, unfiltered COUNT(*)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Truncate in SQL, in the current time zone like date_hierarchy does
+        return super().get_queryset(request).annotate(_created_date=TruncDate('created_at'))
 
     def gross_amount_display(self, obj):
-        return f"KES {obj.gross_amount:,.2f}"
+        return _kes(obj.gross_amount)
     gross_amount_display.short_description = 'Gross Amount'
     gross_amount_display.admin_order_field = 'gross_amount'
 
     def commission_amount_display(self, obj):
-        return f"KES {obj.commission_amount:,.2f}"
+        return _kes(obj.commission_amount)
     commission_amount_display.short_description = 'Commission'
     commission_amount_display.admin_order_field = 'commission_amount'
 
     def net_amount_display(self, obj):
-        return f"KES {obj.net_amount:,.2f}"
+        return _kes(obj.net_amount)
     net_amount_display.short_description = 'Net Amount'
     net_amount_display.admin_order_field = 'net_amount'
 
     def created_date(self, obj):
-        return obj.created_at.date()
+        return obj._created_date
     created_date.short_description = 'Created Date'
     created_date.admin_order_field = 'created_at'
 
     actions = ['mark_as_processed', 'mark_as_paid']
 
     def mark_as_processed(self, request, queryset):
-        updated = queryset.update(status='processed')
+        # update() skips VendorEarning.save(), so stamp processed_at here,
+        # keeping any timestamp an earlier transition already set
+        updated = queryset.update(
+            status='processed', processed_at=Coalesce('processed_at', Value(timezone.now()))
+        )
         self.message_user(request, f'{updated} earnings marked as processed.')
     mark_as_processed.short_description = "Mark selected earnings as processed"
 
     def mark_as_paid(self, request, queryset):
-        updated = queryset.update(status='paid')
+        updated = queryset.update(
+            status='paid', processed_at=Coalesce('processed_at', Value(timezone.now()))
+        )
         self.message_user(request, f'{updated} earnings marked as paid.')
     mark_as_paid.short_description = "Mark selected earnings as paid"
 
@@ -273,59 +461,82 @@ class PayoutTransactionAdmin(admin.ModelAdmin):
         'amount_display', 'status', 'initiated_date', 'completed_date'
     ]
     list_filter = ['payout_method', 'status', 'initiated_at']
-    search_fields = [
-        'vendor__business_name', 'payout_reference', 
-        'recipient_details'
-    ]
+    search_fields = ['vendor__business_name', 'payout_reference']
+    search_help_text = (
+        'Search by vendor or reference, or recipient details as '
+        'phone_number:<value> or recipient_name:<value>'
+    )
     readonly_fields = [
         'initiated_at', 'processed_at', 'completed_at', 
         'gateway_response', 'payout_details'
     ]
     date_hierarchy = 'initiated_at'
     list_select_related = ['vendor']
+    list_per_page = 50
+    list_max_show_all = 200
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _initiated_date=TruncDate('initiated_at'),
+            _completed_date=TruncDate('completed_at'),
+        )
+
+    # Keys the payout views write into recipient_details
+    recipient_search_keys = ('phone_number', 'recipient_name')
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        # "key:value" on a known recipient key also matches a JSON containment
+        # filter the GIN index can serve; an icontains on recipient_details would
+        # cast every row to text. ORed in, so a reference or vendor name that
+        # contains ':' still matches search_fields as before.
+        key, sep, value = search_term.partition(':')
+        key, value = key.strip(), value.strip()
+        if sep and value and key in self.recipient_search_keys:
+            results |= queryset.filter(recipient_details__contains={key: value})
+        return results, may_have_duplicates
 
     def amount_display(self, obj):
-        return f"KES {obj.amount:,.2f}"
+        return _kes(obj.amount)
     amount_display.short_description = 'Amount'
     amount_display.admin_order_field = 'amount'
 
     def initiated_date(self, obj):
-        return obj.initiated_at.date()
+        return obj._initiated_date
     initiated_date.short_description = 'Initiated Date'
     initiated_date.admin_order_field = 'initiated_at'
 
     def completed_date(self, obj):
-        return obj.completed_at.date() if obj.completed_at else '-'
+        return obj._completed_date or '-'
     completed_date.short_description = 'Completed Date'
+    completed_date.admin_order_field = 'completed_at'
 
     def payout_details(self, obj):
         return format_html(
-            """
-            <div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
-                <strong>Payout Details:</strong><br>
-                Method: {method}<br>
-                Amount: KES {amount:,.2f}<br>
-                Status: {status}<br>
-                Reference: {reference}
-            </div>
-            """.format(
-                method=obj.get_payout_method_display(),
-                amount=obj.amount,
-                status=obj.status,
-                reference=obj.payout_reference
-            )
+            _PAYOUT_DETAILS_HTML,
+            _PAYOUT_METHOD_LABELS.get(obj.payout_method, obj.payout_method),
+            f"{obj.amount:,.2f}",
+            obj.status,
+            obj.payout_reference,
         )
     payout_details.short_description = 'Payout Details'
 
     actions = ['mark_as_processing', 'mark_as_completed', 'mark_as_failed']
 
     def mark_as_processing(self, request, queryset):
-        updated = queryset.update(status='processing')
+        # Same timestamps PayoutTransaction.save() sets, in the same UPDATE
+        updated = queryset.update(
+            status='processing', processed_at=Coalesce('processed_at', Value(timezone.now()))
+        )
         self.message_user(request, f'{updated} payouts marked as processing.')
     mark_as_processing.short_description = "Mark selected payouts as processing"
 
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
+        updated = queryset.update(
+            status='completed', completed_at=Coalesce('completed_at', Value(timezone.now()))
+        )
         self.message_user(request, f'{updated} payouts marked as completed.')
     mark_as_completed.short_description = "Mark selected payouts as completed"
 
@@ -350,12 +561,12 @@ class VendorPerformanceAdmin(admin.ModelAdmin):
     list_select_related = ['vendor']
 
     def total_revenue_display(self, obj):
-        return f"KES {obj.total_revenue:,.2f}"
+        return _kes(obj.total_revenue)
     total_revenue_display.short_description = 'Total Revenue'
     total_revenue_display.admin_order_field = 'total_revenue'
 
     def total_earnings_display(self, obj):
-        return f"KES {obj.total_earnings:,.2f}"
+        return _kes(obj.total_earnings)
     total_earnings_display.short_description = 'Total Earnings'
     total_earnings_display.admin_order_field = 'total_earnings'
 
@@ -366,22 +577,12 @@ class VendorPerformanceAdmin(admin.ModelAdmin):
 
     def performance_metrics(self, obj):
         return format_html(
-            """
-            <div style="background: #f8f9fa; padding: 10px; border-radius: 5px;">
-                <strong>Performance Metrics:</strong><br>
-                Completion Rate: {completion_rate:.1f}%<br>
-                Cancellation Rate: {cancellation_rate:.1f}%<br>
-                Average Order Value: KES {avg_order:,.2f}<br>
-                Repeat Customers: {repeat_customers}<br>
-                Satisfaction Score: {satisfaction_score}/5
-            </div>
-            """.format(
-                completion_rate=obj.completion_rate,
-                cancellation_rate=obj.cancellation_rate,
-                avg_order=obj.average_order_value,
-                repeat_customers=obj.repeat_customers,
-                satisfaction_score=obj.customer_satisfaction_score
-            )
+            _PERFORMANCE_METRICS_HTML,
+            f"{obj.completion_rate:.1f}",
+            f"{obj.cancellation_rate:.1f}",
+            f"{obj.average_order_value:,.2f}",
+            obj.repeat_customers,
+            obj.customer_satisfaction_score,
         )
     performance_metrics.short_description = 'Performance Metrics'
 
@@ -408,12 +609,12 @@ class GasProductAdmin(admin.ModelAdmin):
     ]
 
     def price_with_cylinder_display(self, obj):
-        return f"KES {obj.price_with_cylinder:,.2f}"
+        return _kes(obj.price_with_cylinder)
     price_with_cylinder_display.short_description = 'Price with Cylinder'
     price_with_cylinder_display.admin_order_field = 'price_with_cylinder'
 
     def price_without_cylinder_display(self, obj):
-        return f"KES {obj.price_without_cylinder:,.2f}"
+        return _kes(obj.price_without_cylinder)
     price_without_cylinder_display.short_description = 'Price without Cylinder'
     price_without_cylinder_display.admin_order_field = 'price_without_cylinder'
 
@@ -427,6 +628,7 @@ class GasProductAdmin(admin.ModelAdmin):
 
     def mark_as_featured(self, request, queryset):
         updated = queryset.update(featured=True)
+        Vendor.objects.filter(pk__in=queryset.values('vendor_id')).refresh_product_cache()
         self.message_user(request, f'{updated} products marked as featured.')
     mark_as_featured.short_description = "Mark selected products as featured"
 
@@ -437,11 +639,13 @@ class GasProductAdmin(admin.ModelAdmin):
 
     def activate_products(self, request, queryset):
         updated = queryset.update(is_active=True, is_available=True)
+        Vendor.objects.filter(pk__in=queryset.values('vendor_id')).refresh_product_cache()
         self.message_user(request, f'{updated} products activated.')
     activate_products.short_description = "Activate selected products"
 
     def deactivate_products(self, request, queryset):
         updated = queryset.update(is_active=False, is_available=False)
+        Vendor.objects.filter(pk__in=queryset.values('vendor_id')).refresh_product_cache()
         self.message_user(request, f'{updated} products deactivated.')
     deactivate_products.short_description = "Deactivate selected products"
 
@@ -451,11 +655,16 @@ class GasProductImageAdmin(admin.ModelAdmin):
     list_filter = ['is_primary', 'created_at']
     search_fields = ['product__name']
     readonly_fields = ['created_at', 'image_preview']
-    list_select_related = ['product']
+    # GasProduct.__str__ reads the vendor's business name
+    list_select_related = ['product', 'product__vendor']
 
     def image_preview(self, obj):
-        if obj.image:
-            return format_html('<img src="{}" style="max-height: 50px; max-width: 50px;" />', obj.image.url)
+        # Rows uploaded before thumbnails existed fall back to the full image
+        preview = obj.thumbnail or obj.image
+        if preview:
+            return format_html(
+                '<img src="{}" loading="lazy" style="max-height: 50px; max-width: 50px;" />', preview.url
+            )
         return "No image"
     image_preview.short_description = 'Preview'
 
@@ -465,15 +674,16 @@ class GasPriceHistoryAdmin(admin.ModelAdmin):
     list_filter = ['effective_date', 'created_at']
     search_fields = ['product__name']
     readonly_fields = ['created_at']
-    list_select_related = ['product']
+    # GasProduct.__str__ reads the vendor's business name
+    list_select_related = ['product', 'product__vendor']
     date_hierarchy = 'effective_date'
 
     def price_with_cylinder_display(self, obj):
-        return f"KES {obj.price_with_cylinder:,.2f}"
+        return _kes(obj.price_with_cylinder)
     price_with_cylinder_display.short_description = 'Price with Cylinder'
 
     def price_without_cylinder_display(self, obj):
-        return f"KES {obj.price_without_cylinder:,.2f}"
+        return _kes(obj.price_without_cylinder)
     price_without_cylinder_display.short_description = 'Price without Cylinder'
 
 @admin.register(VendorReview)
@@ -483,10 +693,21 @@ class VendorReviewAdmin(admin.ModelAdmin):
     search_fields = ['vendor__business_name', 'customer__username', 'comment']
     readonly_fields = ['created_at']
     list_select_related = ['vendor', 'customer']
+    list_per_page = 50
+    raw_id_fields = ['vendor', 'customer']
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if _is_changelist(request):
+            # The list shows neither the comment nor the vendor's long text
+            # columns that list_select_related would otherwise pull per row
+            queryset = queryset.defer('comment', 'vendor__description', 'vendor__address')
+        return queryset
 
     def rating_stars(self, obj):
-        stars = '★' * obj.rating + '☆' * (5 - obj.rating)
-        return format_html('<span style="color: gold;">{}</span>', stars)
+        if 0 <= obj.rating <= 5:
+            return _STAR_HTML[obj.rating]
+        return format_html('<span style="color: gold;">{}</span>', obj.rating)
     rating_stars.short_description = 'Rating'
 
     def created_date(self, obj):
@@ -501,5 +722,5 @@ class OperatingHoursAdmin(admin.ModelAdmin):
     list_select_related = ['vendor']
 
     def day_display(self, obj):
-        return obj.get_day_display()
+        return _DAY_LABELS.get(obj.day, obj.day)
     day_display.short_description = 'Day'
\ No newline at end of file
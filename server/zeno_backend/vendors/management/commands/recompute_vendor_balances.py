@@ -0,0 +1,22 @@
+# vendors/management/commands/recompute_vendor_balances.py
+from django.core.management.base import BaseCommand
+from vendors.models import Vendor
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the cached vendor balance columns (total_earnings, available_balance, "
+        "pending_payouts, total_paid_out) from earnings and payout records"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor_ids', nargs='*', type=int, help="Only recompute these vendors")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        vendors = Vendor.objects.all()
+        if options['vendor_ids']:
+            vendors = vendors.filter(id__in=options['vendor_ids'])
+
+        changed = vendors.refresh_financials(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed balances for {len(changed)} vendors."))
@@ -0,0 +1,18 @@
+# vendors/management/commands/recompute_vendor_product_cache.py
+from django.core.management.base import BaseCommand
+from vendors.models import Vendor
+
+
+class Command(BaseCommand):
+    help = "Recompute Vendor.cached_min_price and cached_available_count from GasProduct rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor_ids', nargs='*', type=int, help="Only recompute these vendors")
+
+    def handle(self, *args, **options):
+        vendors = Vendor.objects.all()
+        if options['vendor_ids']:
+            vendors = vendors.filter(id__in=options['vendor_ids'])
+
+        updated = vendors.refresh_product_cache()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed product cache for {updated} vendors."))
@@ -0,0 +1,40 @@
+# vendors/management/commands/recompute_vendor_ratings.py
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, BigIntegerField, Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Now
+from vendors.models import Vendor, VendorReview
+
+
+class Command(BaseCommand):
+    help = "Recompute Vendor.average_rating, total_reviews and sum_rating from VendorReview rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('vendor_ids', nargs='*', type=int, help="Only recompute these vendors")
+
+    def handle(self, *args, **options):
+        reviews = VendorReview.objects.filter(vendor=OuterRef('pk')).order_by().values('vendor')
+        vendors = Vendor.objects.all()
+        if options['vendor_ids']:
+            vendors = vendors.filter(id__in=options['vendor_ids'])
+
+        # A single UPDATE with correlated subqueries; no rows come back to Python
+        updated = vendors.update(
+            average_rating=Coalesce(
+                Subquery(reviews.annotate(average=Avg('rating')).values('average')),
+                Value(0),
+                output_field=DecimalField(max_digits=3, decimal_places=2),
+            ),
+            total_reviews=Coalesce(
+                Subquery(reviews.annotate(count=Count('id')).values('count')),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+            sum_rating=Coalesce(
+                Subquery(reviews.annotate(total=Sum('rating')).values('total')),
+                Value(0),
+                output_field=BigIntegerField(),
+            ),
+            # Re-key the vendor detail caches
+            updated_at=Now(),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Recomputed ratings for {updated} vendors."))
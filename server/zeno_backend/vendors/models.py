@@ -1,8 +1,16 @@
 # vendors/models.py
-from django.db import models
+import os
+from decimal import Decimal
+from io import BytesIO
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Upper
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 User = get_user_model()
 
@@ -71,6 +79,19 @@ class VendorPayoutPreference(models.Model):
         verbose_name_plural = "Vendor Payout Preferences"
 
 
+class VendorEarningQuerySet(models.QuerySet):
+    def bulk_record(self, earnings, batch_size=1000):
+        """
+        Insert unsaved VendorEarning instances with bulk_create (one INSERT per
+        batch_size rows instead of one per earning). bulk_create skips save(),
+        so the derived amounts are filled in here first.
+        """
+        earnings = list(earnings)
+        for earning in earnings:
+            earning.fill_derived_fields()
+        return self.bulk_create(earnings, batch_size=batch_size)
+
+
 class VendorEarning(models.Model):
     """Model to track vendor earnings and commissions"""
     EARNING_TYPES = (
@@ -119,7 +140,10 @@ class VendorEarning(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
     
-    def save(self, *args, **kwargs):
+    objects = VendorEarningQuerySet.as_manager()
+    
+    def fill_derived_fields(self):
+        """Derive the amounts and timestamps that callers may leave unset"""
         # Auto-calculate commission and net amount if not set
         if not self.commission_amount and self.gross_amount and self.commission_rate:
             self.commission_amount = (self.gross_amount * self.commission_rate) / 100
@@ -130,7 +154,9 @@ class VendorEarning(models.Model):
         # Set processed timestamp when status changes to processed
         if self.status == 'processed' and not self.processed_at:
             self.processed_at = timezone.now()
-        
+    
+    def save(self, *args, **kwargs):
+        self.fill_derived_fields()
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -139,8 +165,12 @@ class VendorEarning(models.Model):
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['vendor', 'status']),
+            # Leading columns also serve the plain vendor+status lookups
+            models.Index(fields=['vendor', 'status', '-created_at']),
+            # A vendor's earnings in the default ordering, with no status filter
+            models.Index(fields=['vendor', '-created_at']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['earning_type', 'status']),
         ]
 
 
@@ -151,6 +181,10 @@ class PayoutTransaction(models.Model):
     # Payout Details
     payout_method = models.CharField(max_length=20, choices=VendorPayoutPreference.PAYOUT_METHODS)
     payout_reference = models.CharField(max_length=100, unique=True, help_text="External transaction reference")
+    idempotency_key = models.CharField(
+        max_length=64, null=True, blank=True,
+        help_text="Identifies the operation that created this payout; retries reuse the same key"
+    )
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     currency = models.CharField(max_length=3, default='KES')
     
@@ -190,6 +224,25 @@ class PayoutTransaction(models.Model):
         ordering = ['-initiated_at']
         verbose_name = "Payout Transaction"
         verbose_name_plural = "Payout Transactions"
+        # payout_reference is already unique, and so already indexed
+        indexes = [
+            models.Index(fields=['vendor', 'status', '-initiated_at']),
+            # A vendor's payouts in the default ordering, with no status filter
+            models.Index(fields=['vendor', '-initiated_at']),
+            models.Index(fields=['status', '-initiated_at']),
+            models.Index(fields=['initiated_at']),
+            # Serves recipient_details__contains lookups from the admin search
+            GinIndex(fields=['recipient_details'], name='payout_recip_gin', opclasses=['jsonb_path_ops']),
+        ]
+        constraints = [
+            # A retried payout fails inside its own INSERT, and the original is
+            # read back through this index
+            models.UniqueConstraint(
+                fields=['vendor', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='payout_idem_uq',
+            ),
+        ]
 
 
 class VendorPerformance(models.Model):
@@ -240,6 +293,159 @@ class VendorPerformance(models.Model):
         verbose_name_plural = "Vendor Performances"
 
 
+class VendorQuerySet(models.QuerySet):
+    def with_product_counts(self):
+        """
+        Annotate gas product counts in the vendor query itself, so the
+        properties and serializers that report them don't COUNT per vendor
+        """
+        return self.annotate(
+            _gas_products_count=models.Count('gas_products'),
+            _total_gas_products=models.Count('gas_products', filter=models.Q(gas_products__is_active=True)),
+            _available_gas_products_count=models.Count(
+                'gas_products', filter=models.Q(gas_products__is_active=True, gas_products__stock_quantity__gt=0)
+            ),
+        )
+
+    def refresh_product_cache(self):
+        """
+        Recompute cached_min_price/cached_available_count for these vendors
+        with a single UPDATE; returns the number of vendors updated.
+        Also bumps updated_at, which keys the vendor detail caches.
+        """
+        available = GasProduct.objects.filter(
+            vendor=models.OuterRef('pk'), is_active=True, stock_quantity__gt=0
+        ).order_by().values('vendor')
+        return self.update(
+            cached_min_price=models.Subquery(
+                available.annotate(min_price=models.Min('price_with_cylinder')).values('min_price')
+            ),
+            cached_available_count=Coalesce(
+                models.Subquery(available.annotate(count=models.Count('id')).values('count')),
+                models.Value(0),
+                output_field=models.IntegerField(),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    def update_performance_metrics(self):
+        """
+        Refresh the cached order metrics on these vendors and their
+        VendorPerformance rows from one grouped aggregate over orders;
+        returns the updated vendors
+        """
+        from orders.models import Order
+
+        vendors = list(self.only(
+            'id', 'total_orders_count', 'completed_orders_count', 'active_customers_count', 'updated_at'
+        ))
+        vendor_ids = [vendor.pk for vendor in vendors]
+
+        # One grouped aggregate over orders for all the vendors
+        order_stats = {
+            row['vendor']: row
+            for row in Order.objects.filter(vendor_id__in=vendor_ids).order_by().values('vendor').annotate(
+                total_orders=models.Count('id'),
+                completed_orders=models.Count('id', filter=models.Q(status='completed')),
+                avg_order_value=models.Avg('total_amount'),
+                active_customers=models.Count('customer', distinct=True),
+            )
+        }
+        performances = {
+            performance.vendor_id: performance
+            for performance in VendorPerformance.objects.filter(vendor_id__in=vendor_ids)
+        }
+
+        # bulk_update bypasses auto_now, so stamp updated_at (which keys the
+        # vendor detail caches) and metrics_updated_at by hand
+        now = timezone.now()
+        to_create = []
+        for vendor in vendors:
+            stats = order_stats.get(vendor.pk, {})
+            vendor.total_orders_count = stats.get('total_orders', 0)
+            vendor.completed_orders_count = stats.get('completed_orders', 0)
+            vendor.active_customers_count = stats.get('active_customers', 0)
+            vendor.updated_at = now
+
+            performance = performances.get(vendor.pk)
+            if performance is None:
+                performance = VendorPerformance(vendor_id=vendor.pk)
+                to_create.append(performance)
+            performance.total_orders = vendor.total_orders_count
+            performance.completed_orders = vendor.completed_orders_count
+            performance.average_order_value = stats.get('avg_order_value') or 0
+            performance.metrics_updated_at = now
+
+        Vendor.objects.bulk_update(
+            vendors,
+            ['total_orders_count', 'completed_orders_count', 'active_customers_count', 'updated_at'],
+            batch_size=500,
+        )
+        VendorPerformance.objects.bulk_update(
+            list(performances.values()),
+            ['total_orders', 'completed_orders', 'average_order_value', 'metrics_updated_at'],
+            batch_size=500,
+        )
+        VendorPerformance.objects.bulk_create(to_create, batch_size=500)
+        return vendors
+
+    def refresh_financials(self, batch_size=500):
+        """
+        Recompute the cached balance columns (total_earnings, available_balance,
+        pending_payouts, total_paid_out) of these vendors from their earnings and
+        payouts; returns the vendors whose balances changed
+        """
+        vendor_ids = self.values('pk')
+        # One grouped SUM per table instead of per-vendor aggregates
+        earning_totals = {
+            row['vendor']: row
+            for row in VendorEarning.objects.filter(vendor_id__in=vendor_ids).exclude(status='cancelled')
+            .order_by().values('vendor').annotate(
+                credited=models.Sum('net_amount', filter=models.Q(earning_type__in=['order', 'adjustment'])),
+                refunded=models.Sum('net_amount', filter=models.Q(earning_type='refund')),
+            )
+        }
+        payout_totals = {
+            row['vendor']: row
+            for row in PayoutTransaction.objects.filter(vendor_id__in=vendor_ids)
+            .order_by().values('vendor').annotate(
+                pending=models.Sum('amount', filter=models.Q(status__in=['initiated', 'processing'])),
+                paid_out=models.Sum('amount', filter=models.Q(status='completed')),
+            )
+        }
+
+        zero = Decimal('0')
+        # bulk_update bypasses auto_now; updated_at keys the vendor detail caches
+        now = timezone.now()
+        changed = []
+        vendors = self.only(
+            'id', 'total_earnings', 'available_balance', 'pending_payouts', 'total_paid_out', 'updated_at'
+        )
+        for vendor in vendors.iterator():
+            earned = earning_totals.get(vendor.pk, {})
+            paid = payout_totals.get(vendor.pk, {})
+            total_earnings = (earned.get('credited') or zero) - (earned.get('refunded') or zero)
+            pending_payouts = paid.get('pending') or zero
+            total_paid_out = paid.get('paid_out') or zero
+            available_balance = total_earnings - pending_payouts - total_paid_out
+
+            current = (vendor.total_earnings, vendor.available_balance, vendor.pending_payouts, vendor.total_paid_out)
+            if current != (total_earnings, available_balance, pending_payouts, total_paid_out):
+                vendor.total_earnings = total_earnings
+                vendor.available_balance = available_balance
+                vendor.pending_payouts = pending_payouts
+                vendor.total_paid_out = total_paid_out
+                vendor.updated_at = now
+                changed.append(vendor)
+
+        Vendor.objects.bulk_update(
+            changed,
+            ['total_earnings', 'available_balance', 'pending_payouts', 'total_paid_out', 'updated_at'],
+            batch_size=batch_size,
+        )
+        return changed
+
+
 class Vendor(models.Model):
     VENDOR_TYPES = (
         ('gas_station', 'Gas Station'),
@@ -247,6 +453,7 @@ class Vendor(models.Model):
         ('hospital', 'Hospital'),
         ('roadside_assistance', 'Roadside Assistance'),
     )
+    _VENDOR_TYPE_LABELS = dict(VENDOR_TYPES)
     
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='vendor_profile')
     business_name = models.CharField(max_length=255)
@@ -273,12 +480,23 @@ class Vendor(models.Model):
     # Ratings
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
     total_reviews = models.IntegerField(default=0)
+    # Running sum of review ratings, so average_rating = sum_rating / total_reviews
+    # can be maintained without rescanning the vendor's reviews
+    sum_rating = models.BigIntegerField(default=0)
     
     # Gas-specific fields
     delivery_radius_km = models.IntegerField(default=5, help_text="Delivery radius in kilometers")
     min_order_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     delivery_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     
+    # Product summary for the vendor list filters, kept in step with GasProduct
+    # by VendorQuerySet.refresh_product_cache() (see signals.py)
+    cached_min_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, db_index=True,
+        help_text="Cheapest in-stock price_with_cylinder"
+    )
+    cached_available_count = models.IntegerField(default=0, db_index=True, help_text="Active products in stock")
+    
     # ========== NEW DASHBOARD FIELDS ==========
     # Commission & Payout Settings
     commission_rate = models.DecimalField(
@@ -306,17 +524,31 @@ class Vendor(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     # ========== END NEW FIELDS ==========
     
+    objects = VendorQuerySet.as_manager()
+    
     def __str__(self):
-        return f"{self.business_name} ({self.get_business_type_display()})"
+        # Every admin list with a vendor column renders this per row; avoid
+        # get_business_type_display() rebuilding the choices dict each time
+        return f"{self.business_name} ({self._VENDOR_TYPE_LABELS.get(self.business_type, self.business_type)})"
     
-    @property
+    # Cached per instance: serializers and admin pages read it more than once
+    # per render. Only the count is cached, never a queryset.
+    @cached_property
     def total_gas_products(self):
+        if hasattr(self, '_total_gas_products'):
+            return self._total_gas_products
         return self.gas_products.filter(is_active=True).count()
     
     @property
     def available_gas_products(self):
         return self.gas_products.filter(is_active=True, stock_quantity__gt=0)
     
+    @property
+    def available_gas_products_count(self):
+        if hasattr(self, '_available_gas_products_count'):
+            return self._available_gas_products_count
+        return self.available_gas_products.count()
+    
     # ========== NEW PROPERTIES ==========
     @property
     def has_payout_preference(self):
@@ -346,32 +578,27 @@ class Vendor(models.Model):
             return 0
         return (self.total_earnings * (self.commission_rate / 100)) / self.total_orders_count
     
+    def adjust_balances(self, **deltas):
+        """
+        Atomically add deltas to the cached financial columns, e.g.
+        vendor.adjust_balances(available_balance=-amount, pending_payouts=amount)
+        """
+        # F() increments run in the database, so concurrent webhooks can't
+        # overwrite each other's changes the way read-modify-write saves do
+        Vendor.objects.filter(pk=self.pk).update(
+            updated_at=timezone.now(),
+            **{field: models.F(field) + delta for field, delta in deltas.items()}
+        )
+        for field, delta in deltas.items():
+            setattr(self, field, getattr(self, field) + delta)
+    
     def update_performance_metrics(self):
         """Update cached performance metrics"""
-        from orders.models import Order
-        from django.db.models import Count, Avg, Sum
-        
-        # Order metrics
-        order_stats = Order.objects.filter(vendor=self).aggregate(
-            total_orders=Count('id'),
-            completed_orders=Count('id', filter=models.Q(status='completed')),
-            avg_order_value=Avg('total_amount')
-        )
-        
-        # Customer metrics
-        unique_customers = Order.objects.filter(vendor=self).values('customer').distinct().count()
-        
-        # Update fields
-        self.total_orders_count = order_stats['total_orders'] or 0
-        self.completed_orders_count = order_stats['completed_orders'] or 0
-        self.active_customers_count = unique_customers
-        
-        # Create or update performance record
-        performance, created = VendorPerformance.objects.get_or_create(vendor=self)
-        performance.total_orders = self.total_orders_count
-        performance.completed_orders = self.completed_orders_count
-        performance.average_order_value = order_stats['avg_order_value'] or 0
-        performance.save()
+        updated = Vendor.objects.filter(pk=self.pk).update_performance_metrics()
+        if updated:
+            self.total_orders_count = updated[0].total_orders_count
+            self.completed_orders_count = updated[0].completed_orders_count
+            self.active_customers_count = updated[0].active_customers_count
     
     def save(self, *args, **kwargs):
         # Ensure commission rate is within valid range
@@ -383,6 +610,8 @@ class Vendor(models.Model):
         # Create default payout preference if doesn't exist
         creating = self._state.adding
         super().save(*args, **kwargs)
+        # Bound the staleness of cached computed values to the instance's last save
+        self.__dict__.pop('total_gas_products', None)
         
         if creating:
             # Create default payout preference
@@ -393,6 +622,22 @@ class Vendor(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        # Admin list_filter columns and the public vendor filters
+        indexes = [
+            models.Index(fields=['business_type', 'city', 'is_active']),
+            # Bounding-box prefilter in the product location search
+            models.Index(fields=['latitude', 'longitude']),
+            models.Index(fields=['is_verified', 'is_active']),
+            models.Index(fields=['-created_at']),
+            # Admin search_fields: icontains compiles to UPPER(col) LIKE UPPER('%q%')
+            # on PostgreSQL, which only a trigram index on UPPER(col) can serve.
+            # Every OR'd search column needs one or the planner falls back to a
+            # sequential scan. Requires the pg_trgm extension (TrigramExtension).
+            GinIndex(OpClass(Upper('business_name'), name='gin_trgm_ops'), name='vendor_bname_trgm'),
+            GinIndex(OpClass(Upper('city'), name='gin_trgm_ops'), name='vendor_city_trgm'),
+            GinIndex(OpClass(Upper('contact_number'), name='gin_trgm_ops'), name='vendor_contact_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='vendor_email_trgm'),
+        ]
 
 
 
@@ -417,6 +662,7 @@ class GasProduct(models.Model):
         ('50kg', '50 kg'),
         ('100kg', '100 kg'),
     )
+    _CYLINDER_SIZE_LABELS = dict(CYLINDER_SIZES)
     
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='gas_products')
     
@@ -473,7 +719,8 @@ class GasProduct(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
-        return f"{self.name} - {self.get_cylinder_size_display()} ({self.vendor.business_name})"
+        size = self._CYLINDER_SIZE_LABELS.get(self.cylinder_size, self.cylinder_size)
+        return f"{self.name} - {size} ({self.vendor.business_name})"
     
     @property
     def in_stock(self):
@@ -493,20 +740,90 @@ class GasProduct(models.Model):
         
         super().save(*args, **kwargs)
     
+    def adjust_stock(self, delta):
+        """
+        Add delta to stock_quantity with a single UPDATE that derives
+        is_available in SQL, the same way save() does in Python
+        """
+        # SET expressions see the row's pre-update values, hence -delta
+        GasProduct.objects.filter(pk=self.pk).update(
+            stock_quantity=models.F('stock_quantity') + delta,
+            is_available=models.Case(
+                models.When(is_active=True, stock_quantity__gt=-delta, then=models.Value(True)),
+                default=models.Value(False),
+            ),
+            updated_at=timezone.now(),
+        )
+        self.stock_quantity += delta
+        self.is_available = self.in_stock and self.is_active
+        # update() skips post_save, so refresh the vendor's product summary here
+        Vendor.objects.filter(pk=self.vendor_id).refresh_product_cache()
+    
     class Meta:
         ordering = ['gas_type', 'cylinder_size', 'name']
         unique_together = ['vendor', 'gas_type', 'cylinder_size', 'brand']
+        indexes = [
+            # Per-vendor stock counts on the dashboards
+            models.Index(fields=['vendor', 'is_active', 'stock_quantity'], name='gp_vendor_active_stock'),
+            # Public catalogue: GasProductViewSet only lists active, available rows
+            models.Index(
+                fields=['gas_type', 'cylinder_size'],
+                condition=models.Q(is_active=True, is_available=True),
+                name='gp_type_size_available',
+            ),
+            models.Index(
+                fields=['vendor'],
+                condition=models.Q(is_active=True, stock_quantity__gt=0),
+                name='gp_available_partial',
+            ),
+        ]
 
 
 class GasProductImage(models.Model):
     product = models.ForeignKey(GasProduct, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='gas_products/')
+    thumbnail = models.ImageField(upload_to='gas_products/thumbs/', blank=True, editable=False)
     alt_text = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # 2x the 50px admin preview, so it stays sharp on high-DPI screens
+    THUMBNAIL_SIZE = (100, 100)
+    
     def __str__(self):
         return f"Image for {self.product.name}"
+    
+    def save(self, *args, **kwargs):
+        # Only a newly assigned upload is uncommitted; re-saves keep the thumbnail
+        if self.image and not self.image._committed:
+            self._make_thumbnail()
+        if not self.is_primary:
+            return super().save(*args, **kwargs)
+        # The partial unique constraint allows one primary per product, so
+        # demote the current one in the same transaction
+        with transaction.atomic():
+            GasProductImage.objects.filter(product_id=self.product_id, is_primary=True).exclude(
+                pk=self.pk
+            ).update(is_primary=False)
+            super().save(*args, **kwargs)
+    
+    def _make_thumbnail(self):
+        """Render a small JPEG derivative of image into thumbnail"""
+        with Image.open(self.image) as img:
+            img.thumbnail(self.THUMBNAIL_SIZE)
+            buffer = BytesIO()
+            img.convert('RGB').save(buffer, format='JPEG', quality=80)
+        # The upload itself is written to storage after this read
+        self.image.seek(0)
+        name = os.path.splitext(os.path.basename(self.image.name))[0]
+        self.thumbnail.save(f"{name}.jpg", ContentFile(buffer.getvalue()), save=False)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product'], condition=models.Q(is_primary=True), name='one_primary_image_per_product'
+            ),
+        ]
 
 
 class GasPriceHistory(models.Model):
@@ -518,6 +835,13 @@ class GasPriceHistory(models.Model):
     
     def __str__(self):
         return f"Price history for {self.product.name} on {self.effective_date.date()}"
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Keyset (cursor) paging through a product's history
+            models.Index(fields=['product', '-created_at', '-id']),
+        ]
 
 
 class VendorReview(models.Model):
@@ -527,8 +851,24 @@ class VendorReview(models.Model):
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the vendor's sum_rating currently includes for this review;
+        # the rating signals apply the difference on save/delete
+        instance._loaded_vendor_id = instance.__dict__.get('vendor_id')
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+    
     def __str__(self):
         return f"Review for {self.vendor.business_name} by {self.customer.username}"
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Keyset (cursor) paging through a vendor's reviews
+            models.Index(fields=['vendor', '-created_at', '-id']),
+        ]
 
 
 class OperatingHours(models.Model):
@@ -541,6 +881,7 @@ class OperatingHours(models.Model):
         (5, 'Saturday'),
         (6, 'Sunday'),
     )
+    _DAY_LABELS = dict(DAYS_OF_WEEK)
     
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='operating_hours')
     day = models.IntegerField(choices=DAYS_OF_WEEK)
@@ -549,4 +890,10 @@ class OperatingHours(models.Model):
     is_closed = models.BooleanField(default=False)
     
     def __str__(self):
-        return f"{self.get_day_display()}: {self.opening_time} - {self.closing_time}"
\ No newline at end of file
+        return f"{self._DAY_LABELS.get(self.day, self.day)}: {self.opening_time} - {self.closing_time}"
+    
+    class Meta:
+        ordering = ['day']
+        # At most one row per weekday, which also bounds every vendor's
+        # prefetched hours to seven rows
+        unique_together = ['vendor', 'day']
@@ -26,6 +26,12 @@ class VendorSerializer(serializers.ModelSerializer):
                            'total_paid_out', 'total_orders_count', 'completed_orders_count', 
                            'active_customers_count', 'created_at', 'updated_at')
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load what the representation reads beyond Vendor's own columns"""
+        # has_payout_preference is the only related lookup
+        return queryset.select_related('payout_preference')
+
 class VendorProfileSerializer(serializers.ModelSerializer):
     """Serializer for vendor profile with user data"""
     user = serializers.SerializerMethodField()
@@ -144,7 +150,7 @@ class VendorDashboardAnalyticsSerializer(serializers.ModelSerializer):
     
     # Product Analytics
     total_gas_products = serializers.IntegerField(read_only=True)
-    available_gas_products = serializers.IntegerField(read_only=True)
+    available_gas_products = serializers.IntegerField(source='available_gas_products_count', read_only=True)
     low_stock_products = serializers.SerializerMethodField()
     out_of_stock_products = serializers.SerializerMethodField()
     
@@ -188,6 +194,11 @@ class VendorDashboardAnalyticsSerializer(serializers.ModelSerializer):
             'business_name', 'average_rating', 'total_reviews', 'is_verified'
         ]
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load what the representation reads beyond Vendor's own columns"""
+        return queryset.with_product_counts().select_related('payout_preference')
+    
     def get_low_stock_products(self, obj):
         return obj.gas_products.filter(
             stock_quantity__gt=0, 
@@ -383,6 +394,13 @@ class VendorWithProductsSerializer(serializers.ModelSerializer):
             'delivery_fee', 'gas_products', 'operating_hours'
         ]
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load what the representation reads beyond Vendor's own columns"""
+        # The reverse-FK prefetch also fills each product's vendor, so
+        # vendor_name doesn't cost a query per product
+        return queryset.prefetch_related('gas_products', 'operating_hours')
+
 class VendorListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for vendor listings"""
     gas_products_count = serializers.SerializerMethodField()
@@ -396,6 +414,9 @@ class VendorListSerializer(serializers.ModelSerializer):
         ]
     
     def get_gas_products_count(self, obj):
+        # Annotated by Vendor.objects.with_product_counts() on list endpoints
+        if hasattr(obj, '_gas_products_count'):
+            return obj._gas_products_count
         return obj.gas_products.count()
 
 class VendorDashboardSerializer(serializers.ModelSerializer):
@@ -0,0 +1,107 @@
+# vendors/signals.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from users.authentication import user_cache_key
+from .models import GasProduct, OperatingHours, Vendor, VendorPayoutPreference, VendorReview
+
+
+def _apply_rating_delta(vendor_id, rating_delta, count_delta):
+    """Shift a vendor's rating sum/count and re-derive average_rating in one UPDATE"""
+    # SET expressions see the row's pre-update values, so the new totals are spelled out
+    new_sum = Cast(F('sum_rating') + rating_delta, DecimalField(max_digits=12, decimal_places=2))
+    new_count = F('total_reviews') + count_delta
+    Vendor.objects.filter(pk=vendor_id).update(
+        sum_rating=F('sum_rating') + rating_delta,
+        total_reviews=new_count,
+        average_rating=Case(
+            When(total_reviews__lte=-count_delta, then=Value(0)),
+            default=new_sum / new_count,
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def _recompute_rating(vendor_id):
+    """Rebuild a vendor's rating totals from its reviews (the slow path)"""
+    stats = VendorReview.objects.filter(vendor_id=vendor_id).aggregate(total=Sum('rating'), count=Count('id'))
+    total, count = stats['total'] or 0, stats['count']
+    Vendor.objects.filter(pk=vendor_id).update(
+        sum_rating=total,
+        total_reviews=count,
+        average_rating=round(total / count, 2) if count else 0,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=VendorReview)
+def add_review_rating(sender, instance, created, **kwargs):
+    """Fold a new or edited review into Vendor.sum_rating/total_reviews/average_rating"""
+    loaded_vendor_id = getattr(instance, '_loaded_vendor_id', None)
+    loaded_rating = getattr(instance, '_loaded_rating', None)
+    if created:
+        _apply_rating_delta(instance.vendor_id, instance.rating, 1)
+    elif loaded_rating is None:
+        # Loaded with rating deferred (or never loaded), so the old value is unknown
+        _recompute_rating(instance.vendor_id)
+        if loaded_vendor_id and loaded_vendor_id != instance.vendor_id:
+            _recompute_rating(loaded_vendor_id)
+    elif loaded_vendor_id != instance.vendor_id:
+        _apply_rating_delta(loaded_vendor_id, -loaded_rating, -1)
+        _apply_rating_delta(instance.vendor_id, instance.rating, 1)
+    elif instance.rating != loaded_rating:
+        _apply_rating_delta(instance.vendor_id, instance.rating - loaded_rating, 0)
+    instance._loaded_vendor_id = instance.vendor_id
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=VendorReview)
+def remove_review_rating(sender, instance, **kwargs):
+    """Take a deleted review back out of its vendor's rating totals"""
+    # post_delete also fires for cascades and queryset deletes, which a
+    # VendorReview.delete() override would miss
+    rating = getattr(instance, '_loaded_rating', None)
+    vendor_id = getattr(instance, '_loaded_vendor_id', None) or instance.vendor_id
+    if rating is None:
+        _recompute_rating(vendor_id)
+    else:
+        _apply_rating_delta(vendor_id, -rating, -1)
+
+
+@receiver(post_save, sender=GasProduct)
+@receiver(post_delete, sender=GasProduct)
+def refresh_vendor_product_cache(sender, instance, **kwargs):
+    """Keep Vendor.cached_min_price/cached_available_count in step with the vendor's products"""
+    Vendor.objects.filter(pk=instance.vendor_id).refresh_product_cache()
+
+
+@receiver(post_save, sender=OperatingHours)
+@receiver(post_delete, sender=OperatingHours)
+@receiver(post_save, sender=VendorPayoutPreference)
+@receiver(post_delete, sender=VendorPayoutPreference)
+def touch_vendor(sender, instance, **kwargs):
+    """Bump Vendor.updated_at so the cached vendor detail responses are re-rendered"""
+    Vendor.objects.filter(pk=instance.vendor_id).update(updated_at=timezone.now())
+
+
+def _touch_owner(user_id):
+    """Bump User.updated_at so the profile ETag and cached profile (has_vendor_profile) move on"""
+    get_user_model().objects.filter(pk=user_id).update(updated_at=timezone.now())
+    # The user cached by CachedJWTAuthentication still carries the old stamp
+    cache.delete(user_cache_key(user_id))
+
+
+@receiver(post_save, sender=Vendor)
+def touch_new_vendor_owner(sender, instance, created, **kwargs):
+    if created:
+        _touch_owner(instance.user_id)
+
+
+@receiver(post_delete, sender=Vendor)
+def touch_removed_vendor_owner(sender, instance, **kwargs):
+    _touch_owner(instance.user_id)
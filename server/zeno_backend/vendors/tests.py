@@ -1,3 +1,32 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+from .models import GasPriceHistory, GasProduct, Vendor
 
-# Create your tests here.
+
+class GasProductPriceHistoryTests(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username='vendor1', password='secret123', user_type='vendor', phone_number='+254700000001'
+        )
+        vendor = Vendor.objects.create(
+            user=user, business_name='Test Gas', business_type='gas_station',
+            address='1 Test Road', city='Nairobi', contact_number='+254700000001'
+        )
+        self.product = GasProduct.objects.create(
+            vendor=vendor, name='Test LPG', price_with_cylinder=Decimal('3500.00'),
+            price_without_cylinder=Decimal('1200.00'), stock_quantity=10
+        )
+        for price in ('1100.00', '1150.00', '1200.00'):
+            GasPriceHistory.objects.create(
+                product=self.product, price_with_cylinder=Decimal('3500.00'),
+                price_without_cylinder=Decimal(price)
+            )
+
+    def test_price_history_is_cursor_paginated_newest_first(self):
+        response = self.client.get(f'/api/vendors/gas-products/{self.product.pk}/price_history/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('next', response.data)
+        prices = [row['price_without_cylinder'] for row in response.data['results']]
+        self.assertEqual(prices, ['1200.00', '1150.00', '1100.00'])
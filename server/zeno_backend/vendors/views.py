@@ -1,14 +1,19 @@
 # vendors/views.py
 from rest_framework import viewsets, status, permissions, filters
 from rest_framework.decorators import action, api_view
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg, F, Sum, When, Case, IntegerField
+from django.core.cache import cache
+from django.db.models import Q, Count, Avg, F, Sum, When, Case, IntegerField, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
 from django.shortcuts import get_object_or_404
 from django.db import models
+from django.http import Http404
 from django.utils import timezone
 from datetime import timedelta
 import json
+import math
 
 from .models import (
     Vendor, VendorReview, OperatingHours, GasProduct, GasProductImage, 
@@ -21,7 +26,7 @@ from .serializers import (
     GasProductSerializer, GasProductCreateSerializer, GasProductUpdateSerializer,
     GasProductStockUpdateSerializer, VendorDashboardSerializer,
     VendorListSerializer, VendorWithProductsSerializer,
-    GasProductListSerializer, GasProductImageSerializer,
+    GasProductListSerializer, GasProductImageSerializer, GasPriceHistorySerializer,
     # NEW SERIALIZERS
     VendorPayoutPreferenceSerializer, VendorEarningSerializer,
     PayoutTransactionSerializer, VendorPerformanceSerializer,
@@ -29,6 +34,44 @@ from .serializers import (
     VendorPayoutHistorySerializer
 )
 
+EARTH_RADIUS_KM = 6371.0
+
+VENDOR_DETAIL_CACHE_TIMEOUT = 60 * 60
+
+# Columns the list serializers render; list endpoints skip the long text
+# columns (vendor description, product description and ingredients) and the JSON
+# preference blobs. address stays: VendorListSerializer renders it.
+_VENDOR_LIST_COLUMNS = [
+    'id', 'business_name', 'business_type', 'city', 'address', 'contact_number',
+    'average_rating', 'total_reviews', 'is_verified', 'delivery_radius_km', 'delivery_fee'
+]
+_GAS_PRODUCT_LIST_COLUMNS = [
+    'id', 'name', 'gas_type', 'cylinder_size', 'price_with_cylinder', 'price_without_cylinder',
+    'stock_quantity', 'is_available', 'featured', 'vendor', 'vendor__business_name'
+]
+
+def _distance_km(latitude, longitude):
+    """SQL expression for the great-circle (haversine) distance from a point to each vendor"""
+    vendor_lat = Radians(Cast('latitude', FloatField()))
+    vendor_lng = Radians(Cast('longitude', FloatField()))
+    origin_lat = math.radians(latitude)
+    origin_lng = math.radians(longitude)
+    a = (
+        Power(Sin((vendor_lat - Value(origin_lat)) / 2.0), 2)
+        + math.cos(origin_lat) * Cos(vendor_lat) * Power(Sin((vendor_lng - Value(origin_lng)) / 2.0), 2)
+    )
+    return 2.0 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+class HistoryCursorPagination(CursorPagination):
+    """Keyset pagination for append-mostly, time-ordered rows (reviews, price history)"""
+    page_size = 20
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        # Always the keyset order: the view's OrderingFilter and `ordering`
+        # describe the view's own model (e.g. GasProduct), not these rows
+        return self.ordering
+
 class IsVendorOwner(permissions.BasePermission):
     """Custom permission to only allow vendor owners to edit their vendor profile"""
     def has_object_permission(self, request, view, obj):
@@ -48,9 +91,7 @@ class IsVendorOrReadOnly(permissions.BasePermission):
         return request.user.is_authenticated and request.user.user_type in ['vendor', 'mechanic']
 
 class VendorViewSet(viewsets.ModelViewSet):
-    queryset = Vendor.objects.filter(is_active=True).select_related('user').prefetch_related(
-        'operating_hours', 'reviews', 'gas_products', 'payout_preference', 'performance'
-    )
+    queryset = Vendor.objects.filter(is_active=True)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['business_type', 'city', 'is_verified']
     search_fields = ['business_name', 'city', 'address', 'description']
@@ -58,6 +99,29 @@ class VendorViewSet(viewsets.ModelViewSet):
     ordering = ['-average_rating']
     lookup_field = 'id' 
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # VendorListSerializer needs only the product count, not any related rows
+            queryset = queryset.only(*_VENDOR_LIST_COLUMNS).with_product_counts()
+            # Product filters read the cached columns on Vendor, not a GasProduct join
+            params = self.request.query_params
+            if params.get('in_stock', '').lower() == 'true':
+                queryset = queryset.filter(cached_available_count__gt=0)
+            try:
+                max_price = float(params['max_price']) if params.get('max_price') else None
+            except ValueError:
+                max_price = None
+            if max_price is not None:
+                queryset = queryset.filter(cached_min_price__lte=max_price)
+            return queryset
+        # Each detail serializer declares the relations it renders, rather than
+        # every action prefetching all of a vendor's reviews, products and hours
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return VendorCreateSerializer
@@ -81,6 +145,31 @@ class VendorViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticated(), IsVendorOwner()]
         return [permissions.AllowAny()]
 
+    def _cached_detail(self, render):
+        """
+        Return render()'s payload from the cache, keyed on the vendor's updated_at.
+        Every write that changes what the detail endpoints show bumps updated_at
+        (see signals.py), so an edited vendor gets a fresh key and the old entry
+        simply expires.
+        """
+        try:
+            vendor_id = int(self.kwargs[self.lookup_field])
+        except (TypeError, ValueError):
+            raise Http404
+        updated_at = Vendor.objects.filter(is_active=True, id=vendor_id).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404
+        
+        key = f"vendor:{vendor_id}:{self.action}:{updated_at.timestamp()}"
+        data = cache.get(key)
+        if data is None:
+            data = render()
+            cache.set(key, data, VENDOR_DETAIL_CACHE_TIMEOUT)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_detail(lambda: self.get_serializer(self.get_object()).data)
+
     def perform_create(self, serializer):
         # Check if user already has a vendor profile
         if hasattr(self.request.user, 'vendor_profile'):
@@ -110,15 +199,13 @@ class VendorViewSet(viewsets.ModelViewSet):
         """Vendor dashboard with comprehensive stats"""
         vendor = self.get_object()
         
-        # Gas product statistics
-        gas_products = vendor.gas_products.all()
-        total_products = gas_products.count()
-        available_products = gas_products.filter(stock_quantity__gt=0).count()
-        low_stock_products = gas_products.filter(
-            stock_quantity__gt=0, 
-            stock_quantity__lte=models.F('min_stock_alert')
-        ).count()
-        out_of_stock_products = gas_products.filter(stock_quantity=0).count()
+        # Gas product statistics, all four counts in one query
+        product_stats = vendor.gas_products.order_by().aggregate(
+            total=Count('id'),
+            available=Count('id', filter=Q(stock_quantity__gt=0)),
+            low_stock=Count('id', filter=Q(stock_quantity__gt=0, stock_quantity__lte=F('min_stock_alert'))),
+            out_of_stock=Count('id', filter=Q(stock_quantity=0)),
+        )
         
         # Service statistics
         total_services = vendor.services.count()
@@ -142,10 +229,10 @@ class VendorViewSet(viewsets.ModelViewSet):
         dashboard_data = {
             'vendor': VendorDashboardSerializer(vendor).data,
             'gas_products_stats': {
-                'total_products': total_products,
-                'available_products': available_products,
-                'low_stock_products': low_stock_products,
-                'out_of_stock_products': out_of_stock_products,
+                'total_products': product_stats['total'],
+                'available_products': product_stats['available'],
+                'low_stock_products': product_stats['low_stock'],
+                'out_of_stock_products': product_stats['out_of_stock'],
             },
             'services_stats': {
                 'total_services': total_services,
@@ -432,23 +519,40 @@ class VendorViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Simple distance filtering (for production, use GeoDjango or PostGIS)
-        vendors = Vendor.objects.filter(is_active=True, is_verified=True)
+        try:
+            latitude = float(latitude)
+            longitude = float(longitude)
+            radius_km = float(radius_km)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'lat, lng and radius must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # A bounding box on the (latitude, longitude) index narrows the
+        # candidates; the exact distance check and ordering then run in SQL
+        lat_delta = radius_km / 111.0
+        lng_delta = radius_km / (111.0 * max(math.cos(math.radians(latitude)), 0.01))
+        vendors = Vendor.objects.filter(
+            is_active=True,
+            is_verified=True,
+            latitude__range=(latitude - lat_delta, latitude + lat_delta),
+            longitude__range=(longitude - lng_delta, longitude + lng_delta),
+        ).annotate(distance_km=_distance_km(latitude, longitude)).filter(distance_km__lte=radius_km)
         
         # Filter by gas vendors specifically if requested
         business_type = request.query_params.get('business_type')
         if business_type:
             vendors = vendors.filter(business_type=business_type)
         
+        vendors = vendors.only(*_VENDOR_LIST_COLUMNS).with_product_counts().order_by('distance_km')
         serializer = VendorListSerializer(vendors, many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
-    def vendor_with_products(self, request, pk=None):
+    def vendor_with_products(self, request, id=None):
         """Get vendor details with their gas products"""
-        vendor = self.get_object()
-        serializer = VendorWithProductsSerializer(vendor)
-        return Response(serializer.data)
+        return self._cached_detail(lambda: VendorWithProductsSerializer(self.get_object()).data)
 
     @action(detail=False, methods=['get'])
     def top_rated(self, request):
@@ -457,7 +561,7 @@ class VendorViewSet(viewsets.ModelViewSet):
             is_active=True, 
             is_verified=True, 
             average_rating__isnull=False
-        ).order_by('-average_rating')[:10]  # Top 10 vendors
+        ).only(*_VENDOR_LIST_COLUMNS).with_product_counts().order_by('-average_rating')[:10]  # Top 10 vendors
         
         serializer = VendorListSerializer(top_vendors, many=True)
         return Response(serializer.data)
@@ -517,7 +621,13 @@ class GasProductViewSet(viewsets.ModelViewSet):
             queryset = GasProduct.objects.filter(
                 is_active=True, 
                 is_available=True
-            ).select_related('vendor').prefetch_related('images')
+            ).select_related('vendor')
+            # GasProductListSerializer renders neither images nor price history;
+            # GasProductSerializer renders both, one query per product unless prefetched
+            if self.action == 'list':
+                queryset = queryset.only(*_GAS_PRODUCT_LIST_COLUMNS)
+            elif self.action != 'price_history':
+                queryset = queryset.prefetch_related('images', 'price_history')
             
             # Apply filters safely
             vendor_verified = self.request.query_params.get('vendor__is_verified')
@@ -686,6 +796,15 @@ class GasProductViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'])
+    def price_history(self, request, pk=None):
+        """Get a product's price history, newest first, one cursor page at a time"""
+        product = self.get_object()
+        paginator = HistoryCursorPagination()
+        page = paginator.paginate_queryset(product.price_history.all(), request, view=self)
+        serializer = GasPriceHistorySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=['get'])
     def featured_products(self, request):
         """Get featured gas products"""
@@ -740,6 +859,7 @@ class VendorReviewViewSet(viewsets.ModelViewSet):
     queryset = VendorReview.objects.all().select_related('customer', 'vendor')
     serializer_class = VendorReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = HistoryCursorPagination
     
     def perform_create(self, serializer):
         serializer.save(customer=self.request.user)
@@ -747,9 +867,9 @@ class VendorReviewViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def vendor_reviews(self, request, pk=None):
         """Get reviews for a specific vendor"""
-        vendor_reviews = VendorReview.objects.filter(vendor_id=pk)
-        serializer = self.get_serializer(vendor_reviews, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(self.get_queryset().filter(vendor_id=pk))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 class GasProductImageViewSet(viewsets.ModelViewSet):
     queryset = GasProductImage.objects.all()
@@ -770,9 +890,9 @@ class GasProductImageViewSet(viewsets.ModelViewSet):
         """Set an image as primary for the product"""
         image = self.get_object()
         
-        GasProductImage.objects.filter(product=image.product).update(is_primary=False)
+        # GasProductImage.save() demotes the product's previous primary image
         image.is_primary = True
-        image.save()
+        image.save(update_fields=['is_primary'])
         
         return Response({'message': 'Primary image updated successfully'})
 
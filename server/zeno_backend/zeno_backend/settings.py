@@ -88,6 +88,11 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'Chrispine9909'),
         'HOST': os.getenv('DB_HOST', 'zeno.czq8ae44qs94.us-east-2.rds.amazonaws.com'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        # PgBouncer in transaction pooling mode cannot hold server-side cursors
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_PGBOUNCER', 'False').lower() == 'true',
     }
 }
 
@@ -102,6 +107,23 @@ DATABASES = {
    # }
 #}
 
+# Cache
+# Redis is shared across workers; fall back to per-process memory for local dev
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -140,11 +162,34 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',  # Changed to AllowAny for testing
     ),
+    # Per-client caps for the unauthenticated auth endpoints (see ScopedRateThrottle
+    # on the views); counters live in the default cache, not the database. These
+    # are the in-app backstop: the coarse per-IP limit belongs in the reverse
+    # proxy (nginx limit_req) so floods never reach a worker.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '20/min',
+        'register': '20/hour',
+        'otp': '20/hour',
+    },
+    # Proxies in front of Django; throttles key on the client address they append
+    # to X-Forwarded-For instead of the proxy's own (or a client-spoofed) address
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '1')),
+    # orjson encodes/decodes JSON bodies far faster than the stdlib json module;
+    # form/multipart parsers stay for profile picture uploads
+    'DEFAULT_RENDERER_CLASSES': (
+        'drf_orjson_renderer.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'drf_orjson_renderer.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 # JWT Settings
@@ -155,6 +200,7 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_REFRESH_SERIALIZER': 'users.authentication.DenylistTokenRefreshSerializer',
 }
 
 # CORS Settings